@@ -6,10 +6,14 @@ import StateRanking from './components/StateRanking'
 import ScenarioComparison from './components/ScenarioComparison'
 import {
   loadMetadata,
-  loadStateData,
+  loadConfigData,
+  loadCurveData,
+  loadProgramData,
+  loadHouseholdSizeConfigs,
   getCountyGroup,
   buildResult,
   generateChartData,
+  generateCombinedChartData,
   generateHouseholdSizeData,
   calculateAllStates,
 } from './dataLookup'
@@ -72,7 +76,13 @@ function App() {
         const unearnedMonthly = updatedInputs.unearned_income / 12
         const group = updatedInputs.county ? getCountyGroup(stateCode, updatedInputs.county) : null
 
-        const stateData = await loadStateData(stateCode, group)
+        const stateData = {
+          ...await loadConfigData(
+            stateCode, group, updatedInputs.num_adults,
+            updatedInputs.num_children, updatedInputs.is_tanf_enrolled,
+          ),
+          curves: await loadCurveData(stateCode, group),
+        }
         const stateName = states.find(s => s.code === stateCode)?.name || stateCode
 
         const calcResult = buildResult(
@@ -84,13 +94,21 @@ function App() {
           stateData, updatedInputs.num_adults, updatedInputs.num_children,
           updatedInputs.is_tanf_enrolled, earnedMonthly, unearnedMonthly,
         )
+        const programData = await loadProgramData(stateCode, group)
+        const combinedData = programData && generateCombinedChartData(
+          stateData, programData, updatedInputs.num_adults, updatedInputs.num_children,
+          updatedInputs.is_tanf_enrolled, earnedMonthly, unearnedMonthly,
+        )
+        const sizeConfigs = await loadHouseholdSizeConfigs(
+          stateCode, group, updatedInputs.num_adults, updatedInputs.is_tanf_enrolled,
+        )
         const sizeData = generateHouseholdSizeData(
-          stateData, updatedInputs.num_adults,
+          sizeConfigs, updatedInputs.num_adults,
           updatedInputs.is_tanf_enrolled, earnedMonthly, unearnedMonthly,
         )
 
         setResult(calcResult)
-        setChartData({ data: rangeData })
+        setChartData({ data: rangeData, combined: combinedData })
         setHouseholdSizeData(sizeData)
         setLastInputs(updatedInputs)
       } catch {
@@ -130,7 +148,14 @@ function App() {
       const unearnedMonthly = inputs.unearned_income / 12
       const group = inputs.county ? getCountyGroup(inputs.state, inputs.county) : null
 
-      const stateData = await loadStateData(inputs.state, group)
+      // Only this household's grid (a small shard when available), plus the
+      // exact axis curves for earned-only and unearned-only households
+      const stateData = {
+        ...await loadConfigData(
+          inputs.state, group, inputs.num_adults, inputs.num_children, inputs.is_tanf_enrolled,
+        ),
+        curves: await loadCurveData(inputs.state, group),
+      }
       const stateName = states.find(s => s.code === inputs.state)?.name || inputs.state
 
       // Build result from precomputed data
@@ -155,9 +180,25 @@ function App() {
         unearnedMonthly,
       )
 
+      // Total resources (TANF plus SNAP, EITC and CTC) from the stored
+      // program channels, when this state file has them
+      const programData = await loadProgramData(inputs.state, group)
+      const combinedData = programData && generateCombinedChartData(
+        stateData,
+        programData,
+        inputs.num_adults,
+        inputs.num_children,
+        inputs.is_tanf_enrolled,
+        earnedMonthly,
+        unearnedMonthly,
+      )
+
       // Generate household size comparison data
+      const sizeConfigs = await loadHouseholdSizeConfigs(
+        inputs.state, group, inputs.num_adults, inputs.is_tanf_enrolled,
+      )
       const sizeData = generateHouseholdSizeData(
-        stateData,
+        sizeConfigs,
         inputs.num_adults,
         inputs.is_tanf_enrolled,
         earnedMonthly,
@@ -165,7 +206,7 @@ function App() {
       )
 
       setResult(calcResult)
-      setChartData({ data: rangeData })
+      setChartData({ data: rangeData, combined: combinedData })
       setHouseholdSizeData(sizeData)
       setLoading(false)
 
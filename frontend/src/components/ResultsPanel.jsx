@@ -1,5 +1,6 @@
 import BenefitChart from './BenefitChart'
 import HouseholdSizeChart from './HouseholdSizeChart'
+import TotalResourcesChart from './TotalResourcesChart'
 
 function ResultsPanel({ result, chartData, householdSizeData, comparisonData, loading, error, onRetry }) {
   if (error) {
@@ -131,6 +132,17 @@ function ResultsPanel({ result, chartData, householdSizeData, comparisonData, lo
         </div>
       )}
 
+      {chartData?.combined && (
+        <div className="chart-container">
+          <h3>Total resources by income</h3>
+          <TotalResourcesChart
+            data={chartData.combined}
+            currentIncome={currentIncome}
+            fpgMonthly={fpgMonthly}
+          />
+        </div>
+      )}
+
     </section>
   )
 }
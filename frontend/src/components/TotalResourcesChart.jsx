@@ -10,13 +10,29 @@ import {
   ReferenceLine,
 } from 'recharts'
 
+// Benefits stacked on top of income, from the precomputed program channels
+const BENEFITS = [
+  { key: 'tanf_monthly', label: 'TANF', color: '#319795' },
+  { key: 'snap_monthly', label: 'SNAP', color: '#D69E2E' },
+  { key: 'eitc_monthly', label: 'EITC', color: '#805AD5' },
+  { key: 'ctc_monthly', label: 'CTC', color: '#DD6B20' },
+]
+
+const totalBenefits = (point) => BENEFITS.reduce((sum, { key }) => sum + (point[key] || 0), 0)
+
 function TotalResourcesChart({ data, currentIncome, fpgMonthly }) {
   const formatCurrency = (value) => `$${value.toLocaleString()}`
 
+  // Only the programs this state file stores
+  const benefits = useMemo(
+    () => BENEFITS.filter(({ key }) => data?.some(d => key in d)),
+    [data],
+  )
+
   // Y-axis must include the FPL line and the max stacked value
   const yDomain = useMemo(() => {
     if (!data || data.length === 0) return [0, 1000]
-    const maxStacked = Math.max(...data.map(d => d.total_income_monthly + d.tanf_monthly))
+    const maxStacked = Math.max(...data.map(d => d.total_income_monthly + totalBenefits(d)))
     const ceiling = Math.max(maxStacked, fpgMonthly || 0) * 1.1
     // Round up to a nice number
     const step = ceiling > 3000 ? 1000 : ceiling > 1000 ? 500 : 250
@@ -26,7 +42,7 @@ function TotalResourcesChart({ data, currentIncome, fpgMonthly }) {
   const CustomTooltip = ({ active, payload, label }) => {
     if (active && payload && payload.length) {
       const point = payload[0].payload
-      const totalResources = point.total_income_monthly + point.tanf_monthly
+      const totalResources = point.total_income_monthly + totalBenefits(point)
       return (
         <div style={{
           background: '#1a2744',
@@ -43,10 +59,12 @@ function TotalResourcesChart({ data, currentIncome, fpgMonthly }) {
             <span style={{ width: 10, height: 10, borderRadius: 2, background: '#1E293B', flexShrink: 0 }} />
             <span style={{ fontSize: '0.85rem' }}>Income: {formatCurrency(point.total_income_monthly)}</span>
           </div>
-          <div style={{ display: 'flex', alignItems: 'center', gap: '8px', marginBottom: '8px' }}>
-            <span style={{ width: 10, height: 10, borderRadius: 2, background: '#319795', flexShrink: 0 }} />
-            <span style={{ fontSize: '0.85rem' }}>TANF: {formatCurrency(point.tanf_monthly)}</span>
-          </div>
+          {benefits.map(({ key, label, color }, i) => (
+            <div key={key} style={{ display: 'flex', alignItems: 'center', gap: '8px', marginBottom: i === benefits.length - 1 ? '8px' : '4px' }}>
+              <span style={{ width: 10, height: 10, borderRadius: 2, background: color, flexShrink: 0 }} />
+              <span style={{ fontSize: '0.85rem' }}>{label}: {formatCurrency(point[key] || 0)}</span>
+            </div>
+          ))}
           <div style={{ borderTop: '1px solid rgba(255,255,255,0.2)', paddingTop: '8px', marginTop: '4px' }}>
             <span style={{ fontSize: '1.125rem', fontWeight: 700, color: '#4FD1C5' }}>
               Total: {formatCurrency(totalResources)}/mo
@@ -81,7 +99,7 @@ function TotalResourcesChart({ data, currentIncome, fpgMonthly }) {
             domain={yDomain}
             allowDecimals={false}
             tickFormatter={(v) => `$${v.toLocaleString()}`}
-            label={{ value: 'Income + TANF ($/mo)', angle: -90, position: 'insideLeft', dx: -5, style: { textAnchor: 'middle', fill: '#6b7280', fontSize: 11 } }}
+            label={{ value: 'Income + benefits ($/mo)', angle: -90, position: 'insideLeft', dx: -5, style: { textAnchor: 'middle', fill: '#6b7280', fontSize: 11 } }}
             tick={{ fill: '#6b7280', fontSize: 11 }}
             axisLine={{ stroke: '#e5e2dd' }}
             tickLine={{ stroke: '#e5e2dd' }}
@@ -111,14 +129,17 @@ function TotalResourcesChart({ data, currentIncome, fpgMonthly }) {
             fill="#1E293B"
             fillOpacity={0.15}
           />
-          <Area
-            type="monotone"
-            dataKey="tanf_monthly"
-            stackId="1"
-            stroke="#319795"
-            fill="#319795"
-            fillOpacity={0.4}
-          />
+          {benefits.map(({ key, color }) => (
+            <Area
+              key={key}
+              type="monotone"
+              dataKey={key}
+              stackId="1"
+              stroke={color}
+              fill={color}
+              fillOpacity={0.4}
+            />
+          ))}
         </AreaChart>
       </ResponsiveContainer>
     </div>
@@ -8,6 +8,12 @@ const DATA_BASE = `${import.meta.env.BASE_URL}data`
 // Cache for loaded state data files
 const stateDataCache = {}
 
+// Cache for per-state program channel files (SNAP, EITC, CTC); null if absent
+const programDataCache = {}
+
+// Cache for per-state exact axis curves; null if absent
+const curveDataCache = {}
+
 let metadata = null
 
 /**
@@ -34,6 +40,162 @@ export async function loadStateData(stateCode, group = null) {
   return data
 }
 
+// Cache for per-config shard files, keyed by `${filename}/${configKey}`
+const shardCache = {}
+
+// Cache for per-state max-benefit summaries
+const maxBenefitCache = {}
+
+function configKey(numAdults, numChildren, enrolled) {
+  return `${numAdults}_${numChildren}_${String(enrolled).toLowerCase()}`
+}
+
+/**
+ * Whether `precompute.py --shards` wrote per-config files for a state file.
+ */
+function hasShards(filename) {
+  return Boolean(metadata?.shard_files?.includes(filename))
+}
+
+// Compute-on-miss grid service (scripts/grid_cache.py serve); when unset,
+// configs outside the precompute have no grid
+const GRID_CACHE_URL = import.meta.env.VITE_GRID_CACHE_URL
+
+// Cache for grids fetched from the grid service, keyed like shardCache
+const missCache = {}
+
+function isPrecomputed(numAdults, numChildren, enrolled) {
+  return metadata.adults_range.includes(numAdults)
+    && metadata.children_range.includes(numChildren)
+    && (metadata.enrolled_values || [false]).includes(Boolean(enrolled))
+}
+
+/**
+ * Fetch a config grid the precompute doesn't cover from the grid service,
+ * which computes it on first request. Resolves to null if that fails.
+ */
+async function loadMissingConfig(filename, numAdults, numChildren, enrolled) {
+  const cacheKey = `${filename}/${configKey(numAdults, numChildren, enrolled)}`
+  if (!(cacheKey in missCache)) {
+    const params = new URLSearchParams({
+      file: filename,
+      adults: numAdults,
+      children: numChildren,
+      enrolled: String(Boolean(enrolled)),
+    })
+    missCache[cacheKey] = fetch(`${GRID_CACHE_URL}/grid?${params}`)
+      .then(res => (res.ok ? res.json() : null))
+      .then(body => body?.grid || null)
+      .catch(() => null)
+  }
+  return missCache[cacheKey]
+}
+
+/**
+ * Load the grid for one household config, as `{ [configKey]: grid }` so it
+ * works with lookupBenefit and friends. Fetches only that config's shard
+ * (a few KB) when shards exist, else falls back to the whole state file.
+ * Configs outside the precompute come from the grid service, if configured.
+ */
+export async function loadConfigData(stateCode, group, numAdults, numChildren, enrolled) {
+  const filename = group ? `${stateCode}_${group}` : stateCode
+  await loadMetadata()
+  const key = configKey(numAdults, numChildren, enrolled)
+  if (GRID_CACHE_URL && !isPrecomputed(numAdults, numChildren, enrolled)) {
+    const grid = await loadMissingConfig(filename, numAdults, numChildren, enrolled)
+    return grid ? { [key]: grid } : {}
+  }
+  if (!hasShards(filename)) return loadStateData(stateCode, group)
+  const cacheKey = `${filename}/${key}`
+  if (!shardCache[cacheKey]) {
+    const res = await fetch(`${DATA_BASE}/shards/${filename}/${key}.json`)
+    // A missing or stale shard falls back to the whole state file
+    if (!res.ok) return loadStateData(stateCode, group)
+    shardCache[cacheKey] = await res.json()
+  }
+  return { [key]: shardCache[cacheKey] }
+}
+
+/**
+ * Load every children count (0-7) for one adults/enrolled combination, for
+ * the household size chart.
+ */
+export async function loadHouseholdSizeConfigs(stateCode, group, numAdults, enrolled) {
+  const configs = await Promise.all(
+    metadata.children_range.map(children =>
+      loadConfigData(stateCode, group, numAdults, children, enrolled)
+    )
+  )
+  return Object.assign({}, ...configs)
+}
+
+/**
+ * Load a state's `{ [configKey]: benefit at $0 income }` summary. Uses the
+ * shard summary when available, else derives it from the whole state file.
+ */
+export async function loadMaxBenefits(stateCode, group = null) {
+  const filename = group ? `${stateCode}_${group}` : stateCode
+  if (maxBenefitCache[filename]) return maxBenefitCache[filename]
+  await loadMetadata()
+  let summary
+  const res = hasShards(filename) ? await fetch(`${DATA_BASE}/shards/${filename}/max.json`) : null
+  if (res?.ok) {
+    summary = await res.json()
+  } else {
+    const stateData = await loadStateData(stateCode, group)
+    summary = Object.fromEntries(
+      Object.entries(stateData).map(([key, grid]) => [key, grid[0][0]])
+    )
+  }
+  maxBenefitCache[filename] = summary
+  return summary
+}
+
+/**
+ * Load a state's extra program channels (<state>.programs.json), written by
+ * `precompute.py --programs`, as `{ [configKey]: { snap, eitc, ctc } }`.
+ * Resolves to null when the state file has none.
+ */
+export async function loadProgramData(stateCode, group = null) {
+  const filename = group ? `${stateCode}_${group}` : stateCode
+  if (filename in programDataCache) return programDataCache[filename]
+  await loadMetadata()
+  let data = null
+  if (metadata.program_files?.includes(filename)) {
+    try {
+      const res = await fetch(`${DATA_BASE}/${filename}.programs.json`)
+      if (res.ok) data = await res.json()
+    } catch {
+      data = null
+    }
+  }
+  programDataCache[filename] = data
+  return data
+}
+
+/**
+ * Load a state's exact earned-only and unearned-only benefit curves
+ * (<state>.curves.json), written by `precompute.py --curves`, as
+ * `{ [configKey]: { earned, unearned } }`. Resolves to null when the state
+ * file has none. Pass them as `stateData.curves` to use them in lookups.
+ */
+export async function loadCurveData(stateCode, group = null) {
+  const filename = group ? `${stateCode}_${group}` : stateCode
+  if (filename in curveDataCache) return curveDataCache[filename]
+  await loadMetadata()
+  let data = null
+  if (metadata.curve_files?.includes(filename)) {
+    try {
+      const res = await fetch(`${DATA_BASE}/${filename}.curves.json`)
+      if (res.ok) data = await res.json()
+    } catch {
+      data = null
+    }
+  }
+  curveDataCache[filename] = data
+  return data
+}
+
 /**
  * Get the county group number for a given state and county code.
  * Works for CA (regions 1-2), PA (groups 1-4), and VA (groups 2-3).
@@ -80,8 +242,31 @@ function interpolate2D(grid, earnedMonthly, unearnedMonthly) {
   return Math.round(Math.max(0, result))
 }
 
+/**
+ * Linear interpolation on an exact axis curve (see loadCurveData).
+ * Returns null past the end of the curve.
+ */
+function interpolateCurve(values, income) {
+  const step = metadata.curve_step
+  if (income < 0 || income > step * (values.length - 1)) return null
+  const idx = Math.min(Math.floor(income / step), values.length - 2)
+  const frac = (income - idx * step) / step
+  return Math.round(Math.max(0, values[idx] + (values[idx + 1] - values[idx]) * frac))
+}
+
+/**
+ * The config's axis curve for a household with only one kind of income,
+ * or null if it has both or `stateData` carries no curves.
+ */
+function axisCurve(stateData, key, earnedMonthly, unearnedMonthly) {
+  const curve = stateData.curves?.[key]
+  if (!curve || (earnedMonthly > 0 && unearnedMonthly > 0)) return null
+  return unearnedMonthly > 0 ? curve.unearned : curve.earned
+}
+
 /**
  * Look up the TANF monthly benefit for a specific household.
+ * Uses the exact axis curves in `stateData.curves` when one income is $0.
  * Returns { tanf_monthly, eligible }
  */
 export function lookupBenefit(stateData, numAdults, numChildren, enrolled, earnedMonthly, unearnedMonthly) {
@@ -89,10 +274,28 @@ export function lookupBenefit(stateData, numAdults, numChildren, enrolled, earne
   const grid = stateData[key]
   if (!grid) return { tanf_monthly: 0, eligible: false }
 
-  const tanf_monthly = interpolate2D(grid, earnedMonthly, unearnedMonthly)
+  const curve = axisCurve(stateData, key, earnedMonthly, unearnedMonthly)
+  const onCurve = curve && interpolateCurve(curve, earnedMonthly + unearnedMonthly)
+  const tanf_monthly = onCurve ?? interpolate2D(grid, earnedMonthly, unearnedMonthly)
   return { tanf_monthly, eligible: tanf_monthly > 0 }
 }
 
+/**
+ * Look up every stored program for a specific household.
+ * Returns { tanf_monthly, <program>_monthly..., total_benefits_monthly }.
+ */
+export function lookupPrograms(stateData, programData, numAdults, numChildren, enrolled, earnedMonthly, unearnedMonthly) {
+  const key = `${numAdults}_${numChildren}_${String(enrolled).toLowerCase()}`
+  const { tanf_monthly } = lookupBenefit(stateData, numAdults, numChildren, enrolled, earnedMonthly, unearnedMonthly)
+  const result = { tanf_monthly }
+  const channels = programData?.[key] || {}
+  for (const [program, grid] of Object.entries(channels)) {
+    result[`${program}_monthly`] = interpolate2D(grid, earnedMonthly, unearnedMonthly)
+  }
+  result.total_benefits_monthly = Object.values(result).reduce((sum, v) => sum + v, 0)
+  return result
+}
+
 /**
  * Get the max benefit (benefit at $0 income) for a household config.
  */
@@ -106,10 +309,16 @@ export function getMaxBenefit(stateData, numAdults, numChildren, enrolled) {
 /**
  * Generate chart data: TANF benefit over an income range.
  * Sweeps total income from $0 to $maxIncome, maintaining the earned/unearned ratio.
+ * With only one kind of income and axis curves in `stateData.curves`, the
+ * sweep follows the exact curve at its own resolution, so cliffs are sharp.
  */
 export function generateChartData(stateData, numAdults, numChildren, enrolled, earnedMonthly, unearnedMonthly, maxIncome = 3000, step = 50) {
   const totalIncome = earnedMonthly + unearnedMonthly
   const earnedRatio = totalIncome > 0 ? earnedMonthly / totalIncome : 1.0
+  const key = `${numAdults}_${numChildren}_${String(enrolled).toLowerCase()}`
+  if (axisCurve(stateData, key, earnedMonthly, unearnedMonthly)) {
+    step = Math.min(step, metadata.curve_step)
+  }
 
   const data = []
   let lastNonZeroIdx = 0
@@ -130,9 +339,31 @@ export function generateChartData(stateData, numAdults, numChildren, enrolled, e
   return data.slice(0, trimIdx + 1)
 }
 
+/**
+ * Generate combined-benefits chart data (TANF plus stored programs) over an
+ * income range, in the shape of the Python combined-benefits endpoint.
+ */
+export function generateCombinedChartData(stateData, programData, numAdults, numChildren, enrolled, earnedMonthly, unearnedMonthly, maxIncome = 3000, step = 50) {
+  const totalIncome = earnedMonthly + unearnedMonthly
+  const earnedRatio = totalIncome > 0 ? earnedMonthly / totalIncome : 1.0
+
+  const data = []
+  for (let income = 0; income <= maxIncome; income += step) {
+    const earned = income * earnedRatio
+    const unearned = income * (1 - earnedRatio)
+    data.push({
+      total_income_monthly: income,
+      ...lookupPrograms(stateData, programData, numAdults, numChildren, enrolled, earned, unearned),
+    })
+  }
+  return data
+}
+
 /**
  * Calculate all-states comparison for a given household profile.
- * Loads all state data files and looks up benefit for each.
+ * Loads each state's grid for the household (a shard, or the whole file)
+ * and looks up the benefit. A household with no income gets the maximum
+ * benefit, so it only needs each state's max-benefit summary.
  * Returns sorted array (highest benefit first) + maxBenefit.
  */
 export async function calculateAllStates(numAdults, numChildren, enrolled, earnedMonthly, unearnedMonthly) {
@@ -146,8 +377,18 @@ export async function calculateAllStates(numAdults, numChildren, enrolled, earne
   const loadPromises = meta.states.map(async (s) => {
     try {
       const group = defaultGroups[s.code] || null
-      const stateData = await loadStateData(s.code, group)
-      const { tanf_monthly, eligible } = lookupBenefit(stateData, numAdults, numChildren, enrolled, earnedMonthly, unearnedMonthly)
+      const key = configKey(numAdults, numChildren, enrolled)
+      const summary = earnedMonthly === 0 && unearnedMonthly === 0
+        ? await loadMaxBenefits(s.code, group)
+        : null
+      let benefit
+      if (summary && key in summary) {
+        benefit = { tanf_monthly: summary[key], eligible: summary[key] > 0 }
+      } else {
+        const stateData = await loadConfigData(s.code, group, numAdults, numChildren, enrolled)
+        benefit = lookupBenefit(stateData, numAdults, numChildren, enrolled, earnedMonthly, unearnedMonthly)
+      }
+      const { tanf_monthly, eligible } = benefit
       return {
         state: s.code,
         state_name: s.name,
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark: cold import time of the lightweight entry points.
+
+Each module is imported in a fresh interpreter, best of several runs, and
+checked against an import-time budget. policyengine_us must not be loaded
+by any of them; it is only imported once a simulation actually runs.
+
+Usage:
+    python bench_startup.py            # exit 1 if any budget is exceeded
+    python bench_startup.py --runs 10
+"""
+
+import os
+import subprocess
+import sys
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Module -> budget in seconds for a cold import (interpreter startup excluded)
+IMPORT_BUDGETS = {
+    "config": 0.05,
+    "grids": 0.05,
+    "calculator": 0.1,
+    "precompute": 0.1,
+    "score": 0.1,
+    "diff_versions": 0.1,
+    "tiered": 0.1,
+    "grid_cache": 0.1,
+}
+
+_PROBE = """
+import sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(elapsed, "policyengine_us" in sys.modules)
+"""
+
+
+def measure(module: str, runs: int) -> tuple[float, bool]:
+    """Best-of-`runs` cold import time and whether policyengine_us loaded."""
+    best = float("inf")
+    loaded_heavy = False
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", _PROBE.format(module=module)],
+            cwd=SCRIPTS_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.split()
+        best = min(best, float(output[0]))
+        loaded_heavy = loaded_heavy or output[1] == "True"
+    return best, loaded_heavy
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5, help="Runs per module (best is kept)")
+    args = parser.parse_args()
+
+    failed = False
+    for module, budget in IMPORT_BUDGETS.items():
+        elapsed, loaded_heavy = measure(module, args.runs)
+        ok = elapsed <= budget and not loaded_heavy
+        failed = failed or not ok
+        note = " (imports policyengine_us)" if loaded_heavy else ""
+        print(
+            f"  {'ok  ' if ok else 'FAIL'} {module:<12} "
+            f"{elapsed * 1000:7.1f} ms / {budget * 1000:.0f} ms budget{note}"
+        )
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
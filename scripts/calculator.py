@@ -1,8 +1,72 @@
 """
 TANF Calculator using PolicyEngine-US
 """
-from policyengine_us import Simulation
-from config import PILOT_STATES, DEFAULT_YEAR
+import json
+import os
+import tempfile
+import time
+
+from config import PILOT_STATES, DEFAULT_YEAR, DEFAULT_CHILD_AGE, CACHE_DIR
+
+
+def _simulation(situation: dict, reform: dict | None = None, trace: bool = False):
+    """
+    Build a PolicyEngine Simulation, optionally under a parameter reform.
+
+    policyengine_us is imported here rather than at module load: loading the
+    tax-benefit system takes seconds and hundreds of MB, which tools that only
+    need STATE_TANF_VARIABLES, config or the precomputed data shouldn't pay.
+    """
+    from policyengine_us import Simulation
+    kwargs = {"trace": True} if trace else {}
+    if reform:
+        kwargs["reform"] = _reform_class(reform)
+    return Simulation(situation=situation, **kwargs)
+
+
+def warm_process_context():
+    """
+    multiprocessing context whose new processes start with policyengine-us loaded.
+
+    policyengine_us builds its tax-benefit system while being imported, so
+    a saved copy couldn't be restored without paying for that import anyway.
+    Instead a forkserver imports it once and every pool worker, including
+    replacements for recycled ones, is forked from that warm process. The
+    forkserver always imports the installed version, so nothing goes stale.
+    Where forkserver isn't available (Windows) this is the default context;
+    if the preload import fails, workers load policyengine-us on first use.
+    """
+    import multiprocessing
+
+    try:
+        context = multiprocessing.get_context("forkserver")
+    except ValueError:
+        return multiprocessing.get_context()
+    context.set_forkserver_preload(["calculator", "policyengine_us"])
+    return context
+
+
+# Built Reform classes, keyed by their canonical JSON
+_reforms = {}
+
+
+def _reform_class(reform: dict):
+    """
+    PolicyEngine Reform for a parameter reform dict.
+
+    Accepts {parameter path: value} or {parameter path: {period: value}}
+    (periods like "2025-01-01.2100-12-31"); bare values apply to all years.
+    """
+    key = json.dumps(reform, sort_keys=True)
+    if key not in _reforms:
+        from policyengine_core.reforms import Reform
+
+        normalized = {
+            path: value if isinstance(value, dict) else {"2000-01-01.2100-12-31": value}
+            for path, value in reform.items()
+        }
+        _reforms[key] = Reform.from_dict(normalized, country_id="us")
+    return _reforms[key]
 
 
 def _to_float(value):
@@ -90,6 +154,7 @@ def create_situation(
     county: str | None = None,
     is_tanf_enrolled: bool = False,
     resources: float = 0,
+    overrides: dict | None = None,
 ) -> dict:
     """
     Create a PolicyEngine situation dictionary for TANF calculation.
@@ -105,12 +170,15 @@ def create_situation(
         county: County enum name (e.g., "LOS_ANGELES_COUNTY_CA") - optional
         is_tanf_enrolled: Whether currently receiving TANF (affects income tests)
         resources: Total household resources/assets
+        overrides: Precomputed group-level values that replace PolicyEngine's
+            formulas, as {variable: {"entity": "spm_units", "values":
+            {period: value}}} (see find_income_invariant_variables)
 
     Returns:
         PolicyEngine situation dictionary
     """
     if child_ages is None:
-        child_ages = [5] * num_children
+        child_ages = [DEFAULT_CHILD_AGE] * num_children
 
     # Build people dictionary
     people = {}
@@ -256,9 +324,231 @@ def create_situation(
     if is_tanf_enrolled:
         situation["spm_units"]["spm_unit"]["is_tanf_enrolled"] = {year: True}
 
+    # Inputs take precedence over formulas, so these are never recomputed
+    for variable, override in (overrides or {}).items():
+        for group in situation[override["entity"]].values():
+            group[variable] = dict(override["values"])
+
     return situation
 
 
+# ---------------------------------------------------------------------------
+# Capability registry
+# ---------------------------------------------------------------------------
+
+# Variables read by calculate_tanf and the range helpers besides each state's
+# own TANF variable. Not every state's PolicyEngine implementation supports
+# all of them, so support is probed once per state and cached on disk.
+OPTIONAL_VARIABLES = [
+    "tanf",
+    "tanf_max_amount",
+    "tanf_countable_income",
+    "tanf_gross_earned_income",
+    "tanf_gross_unearned_income",
+    "is_tanf_eligible",
+    "is_tanf_demographically_eligible",
+    "is_tanf_economically_eligible",
+    "tax_unit_fpg",
+    "snap",
+    "eitc",
+    "ctc_value",
+    "ctc",
+]
+
+# Households (adults, children, annual earned, annual unearned) a variable
+# is tried on before it counts as unsupported, so one that only fails for a
+# particular household shape doesn't switch the whole state to a fallback
+PROBE_HOUSEHOLDS = [
+    (1, 2, 12000, 1200),
+    (2, 1, 30000, 0),
+    (1, 0, 0, 0),
+]
+
+# {year: {state: {variable: supported}}}, loaded lazily from CACHE_DIR
+_capabilities = None
+
+
+def _policyengine_version() -> str:
+    from importlib.metadata import version as pkg_version
+    return pkg_version("policyengine-us")
+
+
+def _capability_cache_path() -> str:
+    return os.path.join(CACHE_DIR, f"capabilities-{_policyengine_version()}.json")
+
+
+def _load_capability_cache() -> dict:
+    try:
+        with open(_capability_cache_path()) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_capability_cache(capabilities: dict) -> None:
+    """Merge into the on-disk cache and replace it atomically.
+
+    Precompute workers may probe different states concurrently, so the file
+    is re-read before writing rather than overwritten with our view alone.
+    A read-only cache directory just leaves the registry in memory.
+    """
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        merged = _load_capability_cache()
+        for year, states in capabilities.items():
+            merged.setdefault(year, {}).update(states)
+        fd, tmp_path = tempfile.mkstemp(dir=CACHE_DIR, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(merged, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, _capability_cache_path())
+    except OSError:
+        pass
+
+
+def _probe_variables(state: str) -> list[str]:
+    return [STATE_TANF_VARIABLES.get(state, "tanf")] + OPTIONAL_VARIABLES
+
+
+def _probe_state(state: str, year: int) -> dict:
+    """
+    Calculate every probed variable for the PROBE_HOUSEHOLDS.
+
+    A variable is supported if it works for any of them; later households
+    only retry the variables that failed so far. Raises if the first
+    simulation can't be built, since that says nothing about which
+    variables the state supports.
+    """
+    support = {variable: False for variable in _probe_variables(state)}
+    for index, (num_adults, num_children, earned, unearned) in enumerate(PROBE_HOUSEHOLDS):
+        failed = [variable for variable, supported in support.items() if not supported]
+        if not failed:
+            break
+        situation = create_situation(
+            state=state, year=year,
+            num_adults=num_adults, num_children=num_children,
+            earned_income=earned, unearned_income=unearned,
+        )
+        try:
+            simulation = _simulation(situation)
+        except Exception:
+            if index == 0:
+                raise
+            continue
+        for variable in failed:
+            try:
+                simulation.calculate(variable, year)
+                support[variable] = True
+            except Exception:
+                pass
+    return support
+
+
+def get_capabilities(state: str, year: int = DEFAULT_YEAR) -> dict:
+    """
+    Return {variable: supported} for a state and year.
+
+    Probed with a few reference households on first use, then served from
+    memory and the per-version disk cache. If that simulation can't be
+    built, nothing is cached and every variable counts as unsupported.
+    """
+    global _capabilities
+    if _capabilities is None:
+        _capabilities = _load_capability_cache()
+    by_state = _capabilities.setdefault(str(year), {})
+    support = by_state.get(state)
+    if support is None or any(v not in support for v in _probe_variables(state)):
+        try:
+            support = _probe_state(state, year)
+        except Exception:
+            # Possibly transient: treat everything as unsupported for this
+            # call only, and probe again next time
+            return {variable: False for variable in _probe_variables(state)}
+        by_state[state] = support
+        _save_capability_cache({str(year): {state: support}})
+    return support
+
+
+def build_capability_registry(
+    year: int = DEFAULT_YEAR, states: list[str] | None = None
+) -> dict:
+    """Probe all (or the given) states up front, e.g. before forking workers."""
+    return {
+        state: get_capabilities(state, year)
+        for state in (states or sorted(PILOT_STATES))
+    }
+
+
+def _is_supported(state: str, variable: str, year: int) -> bool:
+    return get_capabilities(state, year).get(variable, False)
+
+
+def _tanf_variable(state: str, year: int) -> str:
+    """The state's own TANF variable if it works, otherwise generic tanf."""
+    variable = STATE_TANF_VARIABLES.get(state, "tanf")
+    if variable != "tanf" and _is_supported(state, variable, year):
+        return variable
+    return "tanf"
+
+
+def _calculate_with_fallback(simulation, variable: str, generic: str, period):
+    """
+    Calculate a state-specific variable, retrying the generic one it
+    refines (tanf for ca_tanf, ctc for ctc_value) if it fails for these
+    households. Errors of the generic variable propagate.
+    """
+    try:
+        return simulation.calculate(variable, period)
+    except Exception:
+        if variable == generic:
+            raise
+        return simulation.calculate(generic, period)
+
+
+def _calculate_supported(simulation, state: str, variable: str, year: int):
+    """Like _safe_calculate, but skips variables the state doesn't support."""
+    if not _is_supported(state, variable, year):
+        return None
+    return _safe_calculate(simulation, variable, year)
+
+
+# Optional sections of the calculate_tanf result and the PolicyEngine
+# variables each one reads. tanf_monthly/tanf_annual/eligible are always
+# returned. "diagnostics" adds the zero-income / zero-resources re-runs to
+# eligibility_checks, so it implies "eligibility".
+RESULT_FIELDS = {
+    "breakdown": [
+        "tanf_max_amount",
+        "tanf_countable_income",
+        "tanf_gross_earned_income",
+        "tanf_gross_unearned_income",
+    ],
+    "eligibility": [
+        "is_tanf_eligible",
+        "is_tanf_demographically_eligible",
+        "is_tanf_economically_eligible",
+    ],
+    "poverty": ["tax_unit_fpg"],
+    "diagnostics": [],
+}
+
+
+def _select_variables(simulation, state: str, variables: list[str], year: int) -> dict:
+    """
+    Calculate only the requested variables on a simulation.
+
+    Each variable is still its own simulation.calculate call; the saving is
+    in what isn't asked for. Intermediate variables they share are computed
+    once, since the simulation caches them. Duplicates are calculated once
+    and variables the state doesn't support are skipped, so the result maps
+    each supported variable to a float (or None if it failed for this
+    particular household).
+    """
+    values = {}
+    for variable in dict.fromkeys(variables):
+        values[variable] = _calculate_supported(simulation, state, variable, year)
+    return values
+
+
 def calculate_tanf(
     state: str,
     year: int,
@@ -270,13 +560,31 @@ def calculate_tanf(
     county: str | None = None,
     is_tanf_enrolled: bool = False,
     resources: float = 0,
+    fields: list[str] | None = None,
+    reform: dict | None = None,
 ) -> dict:
     """
     Calculate TANF benefit for a household.
 
+    Args:
+        fields: Optional result sections to compute, any of "breakdown",
+            "eligibility", "poverty" and "diagnostics" (see RESULT_FIELDS).
+            Defaults to all of them; pass [] for the benefit amount only.
+        reform: Optional parameter reform, {parameter path: value} or
+            {parameter path: {period: value}}
+
     Returns:
         Dictionary with TANF benefit amount and eligibility details
     """
+    if fields is None:
+        fields = list(RESULT_FIELDS)
+    unknown = set(fields) - set(RESULT_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown calculate_tanf fields: {sorted(unknown)}")
+    fields = set(fields)
+    if "diagnostics" in fields:
+        fields.add("eligibility")
+
     situation = create_situation(
         state=state,
         year=year,
@@ -290,87 +598,89 @@ def calculate_tanf(
         resources=resources,
     )
 
-    simulation = Simulation(situation=situation)
-
-    # Get the appropriate TANF variable for this state
-    tanf_variable = STATE_TANF_VARIABLES.get(state, "tanf")
+    simulation = _simulation(situation, reform=reform)
 
-    # Calculate TANF benefit
-    try:
-        tanf_amount = _to_float(simulation.calculate(tanf_variable, year))
-    except Exception:
-        # Fall back to generic tanf if state-specific fails
-        tanf_amount = _to_float(simulation.calculate("tanf", year))
+    # Calculate TANF benefit with the state's own variable, falling back
+    # to generic tanf if it fails for this household
+    tanf_amount = _to_float(
+        _calculate_with_fallback(simulation, _tanf_variable(state, year), "tanf", year)
+    )
 
     # Eligibility is determined by whether benefit is > 0
     tanf_eligible = tanf_amount > 0
 
+    # Every variable the selected sections need, and nothing else
+    values = _select_variables(
+        simulation,
+        state,
+        [variable for field in fields for variable in RESULT_FIELDS[field]],
+        year,
+    )
+
     # --- Feature 2: Benefit Breakdown ---
     breakdown = {}
-    max_amount = _safe_calculate(simulation, "tanf_max_amount", year)
-    if max_amount is not None:
-        breakdown["max_benefit_annual"] = max_amount
-        breakdown["max_benefit_monthly"] = round(max_amount / 12)
-    countable_income = _safe_calculate(simulation, "tanf_countable_income", year)
-    if countable_income is not None:
-        breakdown["countable_income_annual"] = countable_income
-        breakdown["countable_income_monthly"] = round(countable_income / 12)
-    gross_earned = _safe_calculate(simulation, "tanf_gross_earned_income", year)
-    if gross_earned is not None:
-        breakdown["gross_earned_income_annual"] = gross_earned
-        breakdown["gross_earned_income_monthly"] = round(gross_earned / 12)
-    gross_unearned = _safe_calculate(simulation, "tanf_gross_unearned_income", year)
-    if gross_unearned is not None:
-        breakdown["gross_unearned_income_annual"] = gross_unearned
-        breakdown["gross_unearned_income_monthly"] = round(gross_unearned / 12)
+    if "breakdown" in fields:
+        max_amount = values.get("tanf_max_amount")
+        if max_amount is not None:
+            breakdown["max_benefit_annual"] = max_amount
+            breakdown["max_benefit_monthly"] = round(max_amount / 12)
+        countable_income = values.get("tanf_countable_income")
+        if countable_income is not None:
+            breakdown["countable_income_annual"] = countable_income
+            breakdown["countable_income_monthly"] = round(countable_income / 12)
+        gross_earned = values.get("tanf_gross_earned_income")
+        if gross_earned is not None:
+            breakdown["gross_earned_income_annual"] = gross_earned
+            breakdown["gross_earned_income_monthly"] = round(gross_earned / 12)
+        gross_unearned = values.get("tanf_gross_unearned_income")
+        if gross_unearned is not None:
+            breakdown["gross_unearned_income_annual"] = gross_unearned
+            breakdown["gross_unearned_income_monthly"] = round(gross_unearned / 12)
 
     # --- Feature 1: Eligibility Explanation ---
     eligibility_checks = {}
-    is_eligible = _safe_calculate(simulation, "is_tanf_eligible", year)
-    if is_eligible is not None:
-        eligibility_checks["overall"] = bool(is_eligible)
-    is_demo_eligible = _safe_calculate(simulation, "is_tanf_demographically_eligible", year)
-    if is_demo_eligible is not None:
-        eligibility_checks["demographic"] = bool(is_demo_eligible)
-    is_econ_eligible = _safe_calculate(simulation, "is_tanf_economically_eligible", year)
-    if is_econ_eligible is not None:
-        eligibility_checks["economic"] = bool(is_econ_eligible)
+    if "eligibility" in fields:
+        is_eligible = values.get("is_tanf_eligible")
+        if is_eligible is not None:
+            eligibility_checks["overall"] = bool(is_eligible)
+        is_demo_eligible = values.get("is_tanf_demographically_eligible")
+        if is_demo_eligible is not None:
+            eligibility_checks["demographic"] = bool(is_demo_eligible)
+        is_econ_eligible = values.get("is_tanf_economically_eligible")
+        if is_econ_eligible is not None:
+            eligibility_checks["economic"] = bool(is_econ_eligible)
 
     # Diagnostic simulations: only when NOT eligible
-    if not tanf_eligible and eligibility_checks:
+    if "diagnostics" in fields and not tanf_eligible and eligibility_checks:
         # Test with zero income to isolate income barrier
         try:
-            zero_income_situation = create_situation(
+            _, eligibility_checks["eligible_with_zero_income"] = _calculate_tanf_amount(
                 state=state, year=year,
                 num_adults=num_adults, num_children=num_children,
                 earned_income=0, unearned_income=0,
                 child_ages=child_ages, county=county,
                 is_tanf_enrolled=is_tanf_enrolled, resources=resources,
+                reform=reform,
             )
-            zero_income_sim = Simulation(situation=zero_income_situation)
-            zero_income_tanf = _to_float(zero_income_sim.calculate(tanf_variable, year))
-            eligibility_checks["eligible_with_zero_income"] = zero_income_tanf > 0
         except Exception:
             pass
 
         # Test with zero resources to isolate resource barrier
         try:
-            zero_resources_situation = create_situation(
+            _, eligibility_checks["eligible_with_zero_resources"] = _calculate_tanf_amount(
                 state=state, year=year,
                 num_adults=num_adults, num_children=num_children,
                 earned_income=earned_income, unearned_income=unearned_income,
                 child_ages=child_ages, county=county,
                 is_tanf_enrolled=is_tanf_enrolled, resources=0,
+                reform=reform,
             )
-            zero_resources_sim = Simulation(situation=zero_resources_situation)
-            zero_resources_tanf = _to_float(zero_resources_sim.calculate(tanf_variable, year))
-            eligibility_checks["eligible_with_zero_resources"] = zero_resources_tanf > 0
         except Exception:
             pass
 
     # --- Feature 5: Poverty Context ---
     poverty_context = {}
-    fpg = _safe_calculate(simulation, "tax_unit_fpg", year)
+    fpg = values.get("tax_unit_fpg")
     if fpg is not None and fpg > 0:
         fpg_monthly = fpg / 12
         income_monthly = (earned_income + unearned_income) / 12
@@ -415,6 +725,93 @@ def calculate_tanf(
     return result
 
 
+# Month evaluated (then scaled by 12) in single-month mode
+REPRESENTATIVE_MONTH = 1
+# Annual (earned, unearned) incomes of the single-month verification households
+SINGLE_MONTH_PROBE_CONFIGS = [(1, 0), (1, 2), (2, 3)]
+SINGLE_MONTH_PROBE_INCOMES = [(0, 0), (6000, 0), (0, 6000), (18000, 3000), (36000, 12000)]
+
+# {(state, year): whether single-month evaluation matches the full year}
+_single_month = {}
+
+
+def supports_single_month(state: str, year: int) -> bool:
+    """
+    Whether a state's TANF amount can be computed from one month.
+
+    True when the TANF variable is defined per month and, for probe
+    households with constant monthly inputs, every month of the year has
+    the same amount and 12 x REPRESENTATIVE_MONTH equals the annual total
+    (no mid-year parameter changes or month-to-month state). Memoized.
+    """
+    import numpy as np
+
+    if (state, year) in _single_month:
+        return _single_month[(state, year)]
+    situation = create_batch_situation([
+        create_situation(
+            state=state, year=year, num_adults=num_adults, num_children=num_children,
+            earned_income=earned, unearned_income=unearned, resources=resources,
+        )
+        for num_adults, num_children in SINGLE_MONTH_PROBE_CONFIGS
+        for earned, unearned in SINGLE_MONTH_PROBE_INCOMES
+        for resources in (0, 20000)
+    ])
+    supported = False
+    try:
+        simulation = _simulation(situation)
+        variable = _tanf_variable(state, year)
+        if simulation.tax_benefit_system.variables[variable].definition_period == "month":
+            months = [
+                simulation.calculate(variable, f"{year}-{month:02d}")
+                for month in range(1, 13)
+            ]
+            representative = months[REPRESENTATIVE_MONTH - 1]
+            supported = bool(
+                all(np.allclose(amounts, representative) for amounts in months)
+                and np.allclose(representative * 12, simulation.calculate(variable, year))
+            )
+    except Exception:
+        supported = False
+    _single_month[(state, year)] = supported
+    return supported
+
+
+def _months_constant(situation: dict) -> bool:
+    """Whether every monthly input in a situation has the same value all 12 months of each year."""
+    for entities in situation.values():
+        for entity in entities.values():
+            for values in entity.values():
+                if not isinstance(values, dict):
+                    continue
+                years = {}
+                for period, value in values.items():
+                    if "-" in str(period):
+                        years.setdefault(str(period)[:4], []).append(value)
+                for monthly in years.values():
+                    if len(monthly) != 12 or any(v != monthly[0] for v in monthly):
+                        return False
+    return True
+
+
+def _annual_tanf(simulation, situation: dict, state: str, year: int, single_month: bool = False):
+    """
+    Annual TANF amount(s) of a simulation.
+
+    With `single_month`, states that pass supports_single_month() and
+    situations whose monthly inputs are constant evaluate one month and
+    scale it by 12 instead of computing all twelve. Falls back to generic
+    tanf if the state-specific variable fails for these households.
+    """
+    variable = _tanf_variable(state, year)
+    period = year
+    scale = 1
+    if single_month and _months_constant(situation) and supports_single_month(state, year):
+        period = f"{year}-{REPRESENTATIVE_MONTH:02d}"
+        scale = 12
+    return _calculate_with_fallback(simulation, variable, "tanf", period) * scale
+
+
 def _calculate_tanf_amount(
     state: str,
     year: int,
@@ -426,26 +823,816 @@ def _calculate_tanf_amount(
     county: str | None = None,
     is_tanf_enrolled: bool = False,
     resources: float = 0,
+    overrides: dict | None = None,
+    reform: dict | None = None,
+    prune: bool = False,
+    single_month: bool = False,
 ) -> tuple[float, bool]:
     """
     Lightweight TANF calculation — returns only (annual_amount, eligible).
     Skips breakdown, eligibility checks, diagnostics, and poverty context.
     Used by range/chart endpoints where only the benefit amount is needed.
+    With `prune`, variables the state's TANF result doesn't use are
+    replaced by constants (see find_prunable_variables); with
+    `single_month`, one month is evaluated and scaled (see _annual_tanf).
+    Both are ignored under a reform, since they're verified against
+    current law.
     """
+    if prune and not reform:
+        overrides = pruned_overrides(state, year, county, overrides, child_ages)
     situation = create_situation(
         state=state, year=year,
         num_adults=num_adults, num_children=num_children,
         earned_income=earned_income, unearned_income=unearned_income,
         child_ages=child_ages, county=county,
         is_tanf_enrolled=is_tanf_enrolled, resources=resources,
+        overrides=overrides,
+    )
+    simulation = _simulation(situation, reform=reform)
+    tanf_amount = _to_float(_annual_tanf(
+        simulation, situation, state, year, single_month and not reform,
+    ))
+    return tanf_amount, tanf_amount > 0
+
+
+def is_demographically_eligible(
+    state: str,
+    year: int,
+    num_adults: int,
+    num_children: int,
+    child_ages: list[int] | None = None,
+    county: str | None = None,
+    is_tanf_enrolled: bool = False,
+) -> bool | None:
+    """
+    Income-independent demographic TANF eligibility of a household config.
+
+    Returns None if the state doesn't support the demographic variable, so
+    callers can't tell either way.
+    """
+    if not _is_supported(state, "is_tanf_demographically_eligible", year):
+        return None
+    situation = create_situation(
+        state=state, year=year,
+        num_adults=num_adults, num_children=num_children,
+        earned_income=0, child_ages=child_ages, county=county,
+        is_tanf_enrolled=is_tanf_enrolled,
+    )
+    value = _safe_calculate(_simulation(situation), "is_tanf_demographically_eligible", year)
+    return None if value is None else bool(value)
+
+
+# Benefit programs that can be read from the same simulation as TANF
+PROGRAMS = ["tanf", "snap", "eitc", "ctc"]
+
+
+def _program_variable(state: str, program: str, year: int) -> str:
+    """The PolicyEngine variable holding a program's annual amount."""
+    if program == "tanf":
+        return _tanf_variable(state, year)
+    if program == "ctc":
+        return "ctc_value" if _is_supported(state, "ctc_value", year) else "ctc"
+    return program
+
+
+def _calculate_program_amounts(
+    state: str,
+    year: int,
+    num_adults: int,
+    num_children: int,
+    earned_income: float,
+    unearned_income: float = 0,
+    child_ages: list[int] | None = None,
+    county: str | None = None,
+    is_tanf_enrolled: bool = False,
+    resources: float = 0,
+    overrides: dict | None = None,
+    programs: list[str] = ("tanf",),
+    single_month: bool = False,
+) -> dict:
+    """
+    Annual amount of several programs (see PROGRAMS) from one simulation.
+
+    TANF errors propagate as in _calculate_tanf_amount; other programs
+    count as 0 when unsupported or failing for this household.
+    `single_month` applies to TANF only (see _annual_tanf).
+    """
+    situation = create_situation(
+        state=state, year=year,
+        num_adults=num_adults, num_children=num_children,
+        earned_income=earned_income, unearned_income=unearned_income,
+        child_ages=child_ages, county=county,
+        is_tanf_enrolled=is_tanf_enrolled, resources=resources,
+        overrides=overrides,
+    )
+    simulation = _simulation(situation)
+    amounts = {}
+    for program in programs:
+        variable = _program_variable(state, program, year)
+        if program == "tanf":
+            amounts[program] = _to_float(
+                _annual_tanf(simulation, situation, state, year, single_month)
+            )
+        elif program == "ctc":
+            try:
+                amounts[program] = _to_float(
+                    _calculate_with_fallback(simulation, variable, "ctc", year)
+                )
+            except Exception:
+                amounts[program] = 0
+        else:
+            amounts[program] = _calculate_supported(simulation, state, variable, year) or 0
+    return amounts
+
+
+# Group entities in a situation; each household has exactly one of each
+GROUP_KEYS = ["tax_units", "spm_units", "households", "families", "marital_units"]
+
+
+def create_batch_situation(situations: list[dict]) -> dict:
+    """
+    Merge several create_situation() results into one multi-household
+    situation so a single Simulation evaluates all of them.
+
+    IDs are prefixed per household. Since every household keeps exactly one
+    of each group entity, group-level results come back in input order.
+    """
+    batch = {"people": {}, **{key: {} for key in GROUP_KEYS}}
+    for index, situation in enumerate(situations):
+        prefix = f"h{index}_"
+        for person_id, person in situation["people"].items():
+            batch["people"][prefix + person_id] = person
+        for key in GROUP_KEYS:
+            for group_id, group in situation[key].items():
+                batch[key][prefix + group_id] = {
+                    **group,
+                    "members": [prefix + member for member in group["members"]],
+                }
+    return batch
+
+
+def _calculate_tanf_amounts(
+    state: str,
+    year: int,
+    households: list[dict],
+    reform: dict | None = None,
+    prune: bool = False,
+    single_month: bool = False,
+) -> list[float]:
+    """
+    Vectorized _calculate_tanf_amount for many households in one state.
+
+    Each household is a dict of create_situation() keyword arguments other
+    than state and year. Returns annual TANF amounts in input order.
+    """
+    if not households:
+        return []
+    if prune and not reform:
+        households = [
+            {**household, "overrides": pruned_overrides(
+                state, year, household.get("county"), household.get("overrides"),
+                household.get("child_ages"),
+            )}
+            for household in households
+        ]
+    situation = create_batch_situation([
+        create_situation(state=state, year=year, **household)
+        for household in households
+    ])
+    simulation = _simulation(situation, reform=reform)
+    values = _annual_tanf(simulation, situation, state, year, single_month and not reform)
+    return [float(value) for value in values]
+
+
+def _amounts_isolating_failures(
+    state: str,
+    year: int,
+    households: list[dict],
+    record=None,
+    **kwargs,
+) -> tuple[list[float | None], int]:
+    """
+    _calculate_tanf_amounts that one failing household can't take down.
+
+    Tries one batched simulation first. If it fails, each household is
+    simulated on its own (_calculate_tanf_amount) and those that still fail
+    get None. `kwargs` (reform, prune, single_month) go to both. `record`,
+    if given, is called as record(seconds, households simulated, error type
+    or None) after every simulation, for telemetry.
+
+    Returns:
+        (annual amounts in input order, simulations run)
+    """
+    started = time.monotonic()
+    try:
+        amounts = _calculate_tanf_amounts(state, year, households, **kwargs)
+        if record:
+            record(time.monotonic() - started, len(households), None)
+        return amounts, 1
+    except Exception as e:
+        if record:
+            record(time.monotonic() - started, len(households), type(e).__name__)
+    amounts = []
+    for household in households:
+        started = time.monotonic()
+        try:
+            amounts.append(_calculate_tanf_amount(state=state, year=year, **kwargs, **household)[0])
+            error = None
+        except Exception as e:
+            amounts.append(None)
+            error = type(e).__name__
+        if record:
+            record(time.monotonic() - started, 1, error)
+    return amounts, 1 + len(households)
+
+
+def _merge_periods(situations: list[dict]) -> dict:
+    """
+    Merge situations of the same household for different years into one.
+
+    Entities and members are shared; the period-keyed values of each input
+    are combined, so one Simulation holds every year.
+    """
+    merged = {}
+    for situation in situations:
+        for key, value in situation.items():
+            if isinstance(value, dict) and isinstance(merged.get(key), dict):
+                merged[key] = _merge_periods([merged[key], value])
+            elif key not in merged:
+                merged[key] = value
+    return merged
+
+
+def _calculate_tanf_amounts_by_year(
+    state: str,
+    years: list[int],
+    households: list[dict],
+    prune: bool = False,
+    single_month: bool = False,
+) -> dict[int, list[float]]:
+    """
+    _calculate_tanf_amounts for several years from a single Simulation.
+
+    Every household gets its inputs for each year, so the entity structure
+    is built once and shared by all periods. Returns {year: annual TANF
+    amounts in input order}.
+    """
+    if not households:
+        return {year: [] for year in years}
+    situations = []
+    for household in households:
+        per_year = []
+        for year in years:
+            overrides = household.get("overrides")
+            if prune:
+                overrides = pruned_overrides(
+                    state, year, household.get("county"), overrides, household.get("child_ages"),
+                )
+            per_year.append(create_situation(
+                state=state, year=year, **{**household, "overrides": overrides}
+            ))
+        situations.append(_merge_periods(per_year))
+    situation = create_batch_situation(situations)
+    simulation = _simulation(situation)
+    return {
+        year: [
+            float(value)
+            for value in _annual_tanf(simulation, situation, state, year, single_month)
+        ]
+        for year in years
+    }
+
+
+def _traced_tanf_nodes(state: str, year: int, households: list[dict]):
+    """Traced batch simulation of a state's TANF variable: (simulation, all trace nodes)."""
+    situation = create_batch_situation([
+        create_situation(state=state, year=year, **household)
+        for household in households
+    ])
+    simulation = _simulation(situation, trace=True)
+    simulation.calculate(_tanf_variable(state, year), year)
+
+    nodes = []
+    stack = list(simulation.tracer.trees)
+    while stack:
+        node = stack.pop()
+        nodes.append(node)
+        stack.extend(node.children)
+    return simulation, nodes
+
+
+def trace_tanf_dependencies(
+    state: str, year: int, households: list[dict]
+) -> tuple[set[str], set[str]]:
+    """
+    Variables and parameters a state's TANF variable reads for some households.
+
+    Runs one traced batch simulation and walks the computation tree. Formulas
+    are vectorized, so branches are evaluated for the whole batch and a few
+    households spread over the income range reach the relevant parameters.
+
+    Returns:
+        (variable names, parameter paths)
+    """
+    _, nodes = _traced_tanf_nodes(state, year, households)
+    variables = {node.name for node in nodes}
+    parameters = {
+        parameter.name
+        for node in nodes
+        for parameter in getattr(node, "parameters", [])
+    }
+    return variables, parameters
+
+
+def _formula_fingerprint(variable) -> str:
+    """Hash of a variable's formulas and the attributes that shape its result."""
+    import hashlib
+    import inspect
+
+    parts = [
+        str(variable.entity.key),
+        str(variable.definition_period),
+        str(variable.default_value),
+        str(getattr(variable, "adds", None)),
+        str(getattr(variable, "subtracts", None)),
+    ]
+    for start, formula in sorted(variable.formulas.items()):
+        try:
+            source = inspect.getsource(formula)
+        except (OSError, TypeError):
+            source = formula.__code__.co_code.hex()
+        parts.append(f"{start}:{source}")
+    return hashlib.sha256("\n".join(parts).encode()).hexdigest()[:16]
+
+
+def _json_value(value):
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    return str(value)
+
+
+def snapshot_tanf_dependencies(state: str, year: int, households: list[dict]) -> dict:
+    """
+    Everything a state's TANF result is computed from, in comparable form.
+
+    Returns {"variables": {name: formula fingerprint}, "parameters":
+    {path: {period: value}}} over the variables and parameters reached by
+    a traced simulation of the households (see trace_tanf_dependencies).
+    Two snapshots taken under different policyengine-us versions are equal
+    when the version bump can't have changed the state's TANF results.
+    """
+    simulation, nodes = _traced_tanf_nodes(state, year, households)
+    system = simulation.tax_benefit_system
+    variables = {}
+    parameters = {}
+    for node in nodes:
+        if node.name not in variables:
+            variables[node.name] = _formula_fingerprint(system.get_variable(node.name))
+        for parameter in getattr(node, "parameters", []):
+            parameters.setdefault(parameter.name, {})[str(parameter.period)] = (
+                _json_value(parameter.value)
+            )
+    return {
+        "variables": dict(sorted(variables.items())),
+        "parameters": dict(sorted(parameters.items())),
+    }
+
+
+def _path_overlaps(a: str, b: str) -> bool:
+    """Whether one parameter path is the other or lies beneath it."""
+    short, long = sorted((a, b), key=len)
+    return long == short or long.startswith((short + ".", short + "["))
+
+
+def parameters_affected(parameters: set[str], changed: list[str]) -> bool:
+    """Whether any changed parameter path overlaps the traced parameters."""
+    return any(
+        _path_overlaps(path, parameter)
+        for path in changed
+        for parameter in parameters
     )
-    simulation = Simulation(situation=situation)
-    tanf_variable = STATE_TANF_VARIABLES.get(state, "tanf")
+
+
+# Variables that usually depend only on household composition and location,
+# plus name fragments identifying state payment-standard style variables.
+# Candidates are only hoisted after checking they really don't vary with income.
+INVARIANT_CANDIDATES = [
+    "tanf_max_amount",
+    "is_tanf_demographically_eligible",
+    "tax_unit_fpg",
+    "spm_unit_size",
+    "tax_unit_size",
+]
+INVARIANT_NAME_FRAGMENTS = [
+    "payment_standard",
+    "need_standard",
+    "standard_of_need",
+    "maximum_benefit",
+    "max_benefit",
+    "demographic",
+]
+
+# Annual (earned, unearned) incomes used to detect and verify invariance
+INVARIANCE_PROBE_INCOMES = [(0, 0), (18000, 0), (0, 18000), (36000, 36000)]
+INVARIANCE_VERIFY_INCOMES = [(0, 0), (6000, 0), (0, 6000), (12000, 6000), (24000, 0), (30000, 30000)]
+
+_ENTITY_GROUPS = {
+    "tax_unit": "tax_units",
+    "spm_unit": "spm_units",
+    "household": "households",
+    "family": "families",
+    "marital_unit": "marital_units",
+}
+
+
+def find_income_invariant_variables(
+    state: str,
+    year: int,
+    num_adults: int,
+    num_children: int,
+    child_ages: list[int] | None = None,
+    county: str | None = None,
+    is_tanf_enrolled: bool = False,
+    resources: float = 0,
+) -> dict:
+    """
+    Compute the income-independent part of one household config once.
+
+    Candidate variables (INVARIANT_CANDIDATES and state variables matching
+    INVARIANT_NAME_FRAGMENTS) are evaluated for every period of the year at
+    several incomes in one batched simulation; those identical everywhere
+    are kept. The result is then verified: the state TANF amount must be
+    unchanged with the values injected at a separate sample of incomes,
+    otherwise nothing is hoisted.
+
+    Returns:
+        Overrides for create_situation() / _calculate_tanf_amount(), or {}
+    """
+    import numpy as np
+
+    def household(earned, unearned, overrides=None):
+        return {
+            "num_adults": num_adults, "num_children": num_children,
+            "earned_income": earned, "unearned_income": unearned,
+            "child_ages": child_ages, "county": county,
+            "is_tanf_enrolled": is_tanf_enrolled, "resources": resources,
+            "overrides": overrides,
+        }
+
+    situation = create_batch_situation([
+        create_situation(state=state, year=year, **household(earned, unearned))
+        for earned, unearned in INVARIANCE_PROBE_INCOMES
+    ])
+    simulation = _simulation(situation)
+    system = simulation.tax_benefit_system
+
+    prefix = STATE_TANF_VARIABLES.get(state, "tanf")
+    candidates = [name for name in INVARIANT_CANDIDATES if name in system.variables]
+    candidates += sorted(
+        name for name in system.variables
+        if name.startswith(prefix) and any(f in name for f in INVARIANT_NAME_FRAGMENTS)
+    )
+
+    overrides = {}
+    for name in candidates:
+        variable = system.variables[name]
+        entity = _ENTITY_GROUPS.get(variable.entity.key)
+        if entity is None or variable.value_type not in (float, int, bool):
+            continue
+        if variable.definition_period == "month":
+            periods = [f"{year}-{month:02d}" for month in range(1, 13)]
+        elif variable.definition_period == "year":
+            periods = [str(year)]
+        else:
+            continue
+        try:
+            values = {period: simulation.calculate(name, period) for period in periods}
+        except Exception:
+            continue
+        if all(np.all(array == array[0]) for array in values.values()):
+            overrides[name] = {
+                "entity": entity,
+                "values": {period: array[0].item() for period, array in values.items()},
+            }
+
+    if not overrides:
+        return {}
+
+    plain = _calculate_tanf_amounts(state, year, [
+        household(earned, unearned) for earned, unearned in INVARIANCE_VERIFY_INCOMES
+    ])
+    hoisted = _calculate_tanf_amounts(state, year, [
+        household(earned, unearned, overrides)
+        for earned, unearned in INVARIANCE_VERIFY_INCOMES
+    ])
+    if not np.allclose(plain, hoisted):
+        return {}
+    return overrides
+
+
+# TANF-only pruning probes: (adults, children) configs x annual (earned,
+# unearned) incomes x resources, for both enrollment statuses
+PRUNE_PROBE_CONFIGS = [(1, 0), (1, 1), (2, 3)]
+PRUNE_PROBE_INCOMES = [(0, 0), (12000, 0), (0, 12000), (36000, 36000)]
+PRUNE_PROBE_RESOURCES = [0, 20000]
+# Sample grid on which pruned and full simulations must agree
+PRUNE_VERIFY_CONFIGS = [(1, 2), (2, 1), (2, 5)]
+PRUNE_VERIFY_INCOMES = [
+    (0, 0), (6000, 0), (0, 6000), (18000, 3000), (30000, 0), (0, 30000), (48000, 12000),
+]
+
+# {(state, year, county): overrides}
+_pruned = {}
+
+
+def find_prunable_variables(state: str, year: int, county: str | None = None) -> dict:
+    """
+    Overrides that cut a state's TANF computation down to what it uses.
+
+    The state TANF variable is traced over probe households covering
+    several configs, incomes, resources and both enrollment statuses. A
+    variable whose formula gave its default (0 or False) for every probe
+    household, in every period it was computed for, is replaced by that
+    default, which skips its whole dependency subtree; only the outermost
+    such variables are kept. Pruned and full simulations must then agree
+    on a separate sample grid, otherwise nothing is pruned. Results are
+    memoized per state, year and county. Probes use DEFAULT_CHILD_AGE, so
+    the result only holds for such households (see pruned_overrides).
+
+    Returns:
+        Overrides for create_situation(), in the format of
+        find_income_invariant_variables(), or {}
+    """
+    import numpy as np
+
+    memo_key = (state, year, county)
+    if memo_key in _pruned:
+        return _pruned[memo_key]
+
+    def household(num_adults, num_children, earned, unearned, resources=0,
+                  enrolled=False, overrides=None):
+        return {
+            "num_adults": num_adults, "num_children": num_children,
+            "earned_income": earned, "unearned_income": unearned,
+            "county": county, "is_tanf_enrolled": enrolled,
+            "resources": resources, "overrides": overrides,
+        }
+
+    probes = [
+        household(num_adults, num_children, earned, unearned, resources, enrolled)
+        for num_adults, num_children in PRUNE_PROBE_CONFIGS
+        for earned, unearned in PRUNE_PROBE_INCOMES
+        for resources in PRUNE_PROBE_RESOURCES
+        for enrolled in (False, True)
+    ]
+    simulation, nodes = _traced_tanf_nodes(state, year, probes)
+    system = simulation.tax_benefit_system
+    target = _tanf_variable(state, year)
+
+    # Whether each computed variable stayed at its default everywhere
+    always_default = {}
+    for node in nodes:
+        variable = system.variables.get(node.name)
+        default = (
+            variable is not None
+            and variable.formulas
+            and variable.value_type in (float, int, bool)
+            and node.children
+            and node.value is not None
+            and bool(np.all(np.asarray(node.value) == variable.default_value))
+        )
+        always_default[node.name] = always_default.get(node.name, True) and bool(default)
+
+    outermost = set()
+    stack = list(simulation.tracer.trees)
+    while stack:
+        node = stack.pop()
+        if node.name != target and always_default.get(node.name):
+            outermost.add(node.name)
+            continue
+        stack.extend(node.children)
+
+    entity_groups = {**_ENTITY_GROUPS, "person": "people"}
+    overrides = {}
+    for name in sorted(outermost):
+        variable = system.variables[name]
+        entity = entity_groups.get(variable.entity.key)
+        if variable.definition_period == "month":
+            periods = [f"{year}-{month:02d}" for month in range(1, 13)]
+        elif variable.definition_period == "year":
+            periods = [str(year)]
+        else:
+            continue
+        if entity is not None:
+            overrides[name] = {
+                "entity": entity,
+                "values": {period: variable.default_value for period in periods},
+            }
+
+    if overrides:
+        sample = [
+            (num_adults, num_children, earned, unearned)
+            for num_adults, num_children in PRUNE_VERIFY_CONFIGS
+            for earned, unearned in PRUNE_VERIFY_INCOMES
+        ]
+        full = _calculate_tanf_amounts(state, year, [household(*point) for point in sample])
+        pruned = _calculate_tanf_amounts(state, year, [
+            household(*point, overrides=overrides) for point in sample
+        ])
+        if not np.allclose(full, pruned):
+            overrides = {}
+    _pruned[memo_key] = overrides
+    return overrides
+
+
+def pruned_overrides(
+    state: str,
+    year: int,
+    county: str | None = None,
+    overrides: dict | None = None,
+    child_ages: list[int] | None = None,
+) -> dict | None:
+    """
+    `overrides` plus the TANF-only pruning for the state, or them alone if
+    pruning fails.
+
+    Pruning is verified with DEFAULT_CHILD_AGE only; a variable for infants
+    or teens may never have left its default there, so households with
+    other child ages aren't pruned.
+    """
+    if child_ages and any(age != DEFAULT_CHILD_AGE for age in child_ages):
+        return overrides or None
     try:
-        tanf_amount = _to_float(simulation.calculate(tanf_variable, year))
+        pruning = find_prunable_variables(state, year, county)
     except Exception:
-        tanf_amount = _to_float(simulation.calculate("tanf", year))
-    return tanf_amount, tanf_amount > 0
+        pruning = {}
+    return {**pruning, **(overrides or {})} or None
+
+
+def find_breakeven_incomes(
+    state: str,
+    year: int,
+    searches: list[dict],
+    income_max: float = 120000,
+    tolerance: float = 12,
+) -> list[float | None]:
+    """
+    Batched break-even search: the income at which TANF first reaches $0.
+
+    Each search is a dict with "household" (create_situation() keyword
+    arguments other than state, year and the searched income) and
+    "income_type" ("earned" or "unearned"); the other income type keeps the
+    household's value. Searches run in lockstep, one multi-household
+    simulation per step. Each step tries a secant extrapolation from the
+    last two positive benefits (exact for linear phase-outs) and falls back
+    to bisection whenever that doesn't halve the bracket, so every search
+    reaches `tolerance` (annual dollars) in at most ~log2(income_max /
+    tolerance) steps.
+
+    Returns:
+        Annual income per search, rounded to the dollar, or None if the
+        household is ineligible at zero income or still eligible at
+        income_max.
+    """
+    def evaluate(points):
+        households = []
+        for search, income in points:
+            household = dict(search["household"])
+            household[f"{search['income_type']}_income"] = income
+            households.append(household)
+        return _calculate_tanf_amounts(state, year, households)
+
+    # Bracket every search between zero income and income_max
+    ends = evaluate(
+        [(search, 0) for search in searches]
+        + [(search, income_max) for search in searches]
+    )
+    brackets = []
+    for index in range(len(searches)):
+        at_zero, at_max = ends[index], ends[len(searches) + index]
+        if at_zero > 0 and at_max <= 0:
+            # lo, benefit at lo, previous positive point, hi, use bisection
+            brackets.append({"lo": 0.0, "f_lo": at_zero, "prev": None,
+                             "hi": float(income_max), "bisect": False})
+        else:
+            brackets.append(None)
+
+    while True:
+        active = [
+            (search, bracket) for search, bracket in zip(searches, brackets)
+            if bracket is not None and bracket["hi"] - bracket["lo"] > tolerance
+        ]
+        if not active:
+            break
+        points = []
+        for search, bracket in active:
+            lo, hi = bracket["lo"], bracket["hi"]
+            guess = (lo + hi) / 2
+            prev = bracket["prev"]
+            if not bracket["bisect"] and prev is not None and prev[1] > bracket["f_lo"]:
+                secant = lo + bracket["f_lo"] * (lo - prev[0]) / (prev[1] - bracket["f_lo"])
+                if lo < secant < hi:
+                    # Aim just past the root so a linear phase-out lands on $0
+                    guess = min(secant + tolerance / 2, hi - tolerance / 2)
+            bracket["width"] = hi - lo
+            points.append((search, guess))
+        for (search, bracket), (_, income), amount in zip(active, points, evaluate(points)):
+            if amount > 0:
+                bracket["prev"] = (bracket["lo"], bracket["f_lo"])
+                bracket["lo"], bracket["f_lo"] = income, amount
+            else:
+                bracket["hi"] = income
+            bracket["bisect"] = bracket["hi"] - bracket["lo"] > bracket["width"] / 2
+
+    return [
+        round(bracket["hi"]) if bracket is not None else None
+        for bracket in brackets
+    ]
+
+
+def find_breakeven_income(
+    state: str,
+    year: int,
+    num_adults: int,
+    num_children: int,
+    income_type: str = "earned",
+    other_income: float = 0,
+    income_max: float = 120000,
+    tolerance: float = 12,
+    child_ages: list[int] | None = None,
+    county: str | None = None,
+    is_tanf_enrolled: bool = False,
+    resources: float = 0,
+) -> float | None:
+    """
+    Find the annual income at which a household loses TANF.
+
+    Searches `income_type` ("earned" or "unearned") while the other income
+    type stays at `other_income`, to within `tolerance` annual dollars
+    (default $1/mo). See find_breakeven_incomes for the search itself.
+
+    Returns:
+        Lowest annual income with no TANF benefit, or None if the household
+        is ineligible at zero income or still eligible at income_max.
+    """
+    if income_type not in ("earned", "unearned"):
+        raise ValueError(f"income_type must be 'earned' or 'unearned', got {income_type!r}")
+    other_type = "unearned" if income_type == "earned" else "earned"
+    household = {
+        "num_adults": num_adults,
+        "num_children": num_children,
+        f"{other_type}_income": other_income,
+        "child_ages": child_ages,
+        "county": county,
+        "is_tanf_enrolled": is_tanf_enrolled,
+        "resources": resources,
+    }
+    (breakeven,) = find_breakeven_incomes(
+        state, year,
+        [{"household": household, "income_type": income_type}],
+        income_max=income_max, tolerance=tolerance,
+    )
+    return breakeven
+
+
+def get_cliff_analysis(
+    state: str,
+    num_adults: int,
+    num_children: int,
+    county: str | None = None,
+    is_tanf_enrolled: bool = False,
+) -> dict | None:
+    """
+    Precomputed marginal reduction rates and cliffs for a household config.
+
+    Served from the cliff map precompute.py writes next to each state grid
+    (``precompute.py --cliffs``), so no simulation runs. Rates are the TANF
+    lost per extra dollar between adjacent grid points; cliffs are the
+    monthly income at which the benefit reaches $0 along each grid row.
+    A cliff is None both where the row stays eligible across the whole grid
+    and where it is never eligible (no benefit even at $0 along that axis);
+    the row's first cell in the state grid tells the two apart.
+
+    Returns:
+        Dictionary with earned/unearned steps, rates and cliffs, or None if
+        no cliff map has been generated for this state.
+    """
+    import grids
+
+    cliff_map = grids.load_cliff_map(grids.output_name(state, county))
+    if cliff_map is None:
+        return None
+    entry = cliff_map.get(grids.config_key(num_adults, num_children, is_tanf_enrolled))
+    if entry is None:
+        return None
+    metadata = grids.load_metadata()
+    return {
+        "earned_steps": metadata["earned_steps"],
+        "unearned_steps": metadata["unearned_steps"],
+        **entry,
+    }
 
 
 def calculate_tanf_over_income_range(
@@ -462,11 +1649,13 @@ def calculate_tanf_over_income_range(
     county: str | None = None,
     is_tanf_enrolled: bool = False,
     resources: float = 0,
+    prune: bool = False,
 ) -> list[dict]:
     """
     Calculate TANF benefits over a range of total household income values.
     Splits each total income point into earned/unearned using the ratio
     from the user's actual input. Used for generating charts.
+    `prune` runs TANF-only simulations (see find_prunable_variables).
 
     Returns:
         List of dictionaries with income and corresponding TANF benefit
@@ -495,6 +1684,7 @@ def calculate_tanf_over_income_range(
             county=county,
             is_tanf_enrolled=is_tanf_enrolled,
             resources=resources,
+            prune=prune,
         )
         results.append({
             "total_income_monthly": round(total_income / 12),
@@ -535,7 +1725,8 @@ def calculate_combined_benefits_over_income_range(
     else:
         earned_ratio = 1.0
 
-    tanf_variable = STATE_TANF_VARIABLES.get(state, "tanf")
+    tanf_variable = _program_variable(state, "tanf", year)
+    ctc_variable = _program_variable(state, "ctc", year)
     results = []
     total_income = income_min
 
@@ -550,32 +1741,38 @@ def calculate_combined_benefits_over_income_range(
             child_ages=child_ages, county=county,
             is_tanf_enrolled=is_tanf_enrolled, resources=resources,
         )
-        simulation = Simulation(situation=situation)
+        simulation = _simulation(situation)
 
         point = {"total_income_monthly": round(total_income / 12)}
 
         # TANF
         if "tanf" in include_programs:
-            tanf_val = _safe_calculate(simulation, tanf_variable, year)
-            if tanf_val is None:
-                tanf_val = _safe_calculate(simulation, "tanf", year) or 0
+            try:
+                tanf_val = _to_float(
+                    _calculate_with_fallback(simulation, tanf_variable, "tanf", year)
+                )
+            except Exception:
+                tanf_val = 0
             point["tanf_monthly"] = round(tanf_val / 12, 2)
 
         # SNAP
         if "snap" in include_programs:
-            snap_val = _safe_calculate(simulation, "snap", year) or 0
+            snap_val = _calculate_supported(simulation, state, "snap", year) or 0
             point["snap_monthly"] = round(snap_val / 12, 2)
 
         # EITC
         if "eitc" in include_programs:
-            eitc_val = _safe_calculate(simulation, "eitc", year) or 0
+            eitc_val = _calculate_supported(simulation, state, "eitc", year) or 0
             point["eitc_monthly"] = round(eitc_val / 12, 2)
 
         # CTC
         if "ctc" in include_programs:
-            ctc_val = _safe_calculate(simulation, "ctc_value", year)
-            if ctc_val is None:
-                ctc_val = _safe_calculate(simulation, "ctc", year) or 0
+            try:
+                ctc_val = _to_float(
+                    _calculate_with_fallback(simulation, ctc_variable, "ctc", year)
+                )
+            except Exception:
+                ctc_val = 0
             point["ctc_monthly"] = round(ctc_val / 12, 2)
 
         # Total
@@ -1,5 +1,7 @@
 # Configuration for TANF Calculator
 
+import os
+
 # All states with TANF implementations in PolicyEngine-US
 # Note: States use different program names (TANF, TAFDC, TAFI, TFA, etc.)
 PILOT_STATES = {
@@ -59,6 +61,12 @@ PILOT_STATES = {
 # States with working TANF implementations (all of them)
 STATES_WITH_TANF = set(PILOT_STATES.keys())
 
+# States known to have a TANF benefit that can rise with earned or unearned
+# income somewhere in the grid. precompute.py --monotone never skips cells
+# for them; every other state must also pass precompute.probe_monotone
+# each run, and a randomized sample of skipped cells is still re-checked.
+NON_MONOTONE_STATES = set()
+
 # States that require county selection (affects benefit calculation)
 STATES_REQUIRING_COUNTY = {"CA", "PA", "VA"}
 
@@ -330,3 +338,13 @@ VA_COUNTIES = [
 
 # Default year for calculations
 DEFAULT_YEAR = 2025
+
+# Age given to children when no ages are specified
+DEFAULT_CHILD_AGE = 5
+
+# Local cache for derived artifacts (capability registry, etc.), keyed by
+# policyengine-us version inside each file name
+CACHE_DIR = os.environ.get(
+    "TANF_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "tanf-calculator"),
+)
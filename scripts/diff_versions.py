@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Find the state files whose TANF rules differ between two policyengine-us versions.
+
+A snapshot records, for every state file, the variables and parameters that
+the state's STATE_TANF_VARIABLES entry reaches in a traced simulation, with
+a fingerprint of each formula and each parameter's values. Diffing two
+snapshots gives the state files (states and county groups) to regenerate.
+
+Snapshots are taken with whatever policyengine-us the interpreter has
+installed, so compare versions by pointing at two environments' Pythons
+(each must be able to import this script's dependencies) or at saved
+snapshot files.
+
+Usage:
+    python diff_versions.py snapshot snapshots/1.598.0.json
+    python diff_versions.py diff snapshots/1.598.0.json snapshots/1.610.0.json
+    python diff_versions.py diff old-venv/bin/python new-venv/bin/python
+    python precompute.py --files CA_1,NY    # recompute what the diff printed
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+# Households traced per state file: (adults, children) x ($/mo earned, unearned)
+SNAPSHOT_CONFIGS = [(1, 0), (1, 1), (2, 3)]
+SNAPSHOT_INCOMES = [(0, 0), (1000, 0), (0, 1000), (2500, 2500)]
+
+
+def take_snapshot() -> dict:
+    """Dependency snapshot of every state file under the installed policyengine-us."""
+    from importlib.metadata import version as pkg_version
+
+    from calculator import snapshot_tanf_dependencies
+    from precompute import YEAR, state_files
+
+    files = {}
+    for state_code, county, name in state_files():
+        households = [
+            {
+                "num_adults": num_adults,
+                "num_children": num_children,
+                "earned_income": earned * 12,
+                "unearned_income": unearned * 12,
+                "county": county,
+            }
+            for num_adults, num_children in SNAPSHOT_CONFIGS
+            for earned, unearned in SNAPSHOT_INCOMES
+        ]
+        try:
+            files[name] = snapshot_tanf_dependencies(state_code, YEAR, households)
+        except Exception as e:
+            files[name] = {"error": f"{type(e).__name__}: {e}"}
+        print(f"  {name}: {len(files[name].get('variables', {}))} variables", file=sys.stderr)
+    return {
+        "policyengine_us_version": pkg_version("policyengine-us"),
+        "year": YEAR,
+        "files": files,
+    }
+
+
+def load_snapshot(source: str) -> dict:
+    """Read a snapshot file, or take one with another environment's Python."""
+    if source.endswith(".json"):
+        with open(source) as f:
+            return json.load(f)
+    fd, path = tempfile.mkstemp(suffix=".json")
+    os.close(fd)
+    try:
+        subprocess.run([source, os.path.abspath(__file__), "snapshot", path], check=True)
+        with open(path) as f:
+            return json.load(f)
+    finally:
+        os.remove(path)
+
+
+def _changed_keys(old: dict, new: dict) -> list[str]:
+    return sorted(key for key in old.keys() | new.keys() if old.get(key) != new.get(key))
+
+
+def diff_snapshots(old: dict, new: dict) -> dict:
+    """
+    State files whose TANF dependencies differ between two snapshots.
+
+    Returns {file name: {"variables": [...], "parameters": [...]}} listing
+    the changed formulas and parameters. Files that are new, gone or failed
+    to trace in either snapshot count as changed with an "error" entry.
+    """
+    changes = {}
+    for name in sorted(old["files"].keys() | new["files"].keys()):
+        before = old["files"].get(name)
+        after = new["files"].get(name)
+        if before is None or after is None:
+            changes[name] = {"error": "added" if before is None else "removed"}
+            continue
+        error = after.get("error") or before.get("error")
+        if error:
+            changes[name] = {"error": error}
+            continue
+        variables = _changed_keys(before["variables"], after["variables"])
+        parameters = _changed_keys(before["parameters"], after["parameters"])
+        if variables or parameters:
+            changes[name] = {"variables": variables, "parameters": parameters}
+    return changes
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    snapshot = commands.add_parser("snapshot", help="Write a snapshot for the installed version")
+    snapshot.add_argument("output", help="Snapshot JSON path")
+    diff = commands.add_parser("diff", help="List state files whose TANF rules changed")
+    diff.add_argument("old", help="Snapshot .json or Python interpreter of the old version")
+    diff.add_argument("new", help="Snapshot .json or Python interpreter of the new version")
+    diff.add_argument("--output", help="Also write the comma-separated file list here")
+    args = parser.parse_args()
+
+    if args.command == "snapshot":
+        result = take_snapshot()
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=1, sort_keys=True)
+        print(f"Snapshot: {args.output} (policyengine-us {result['policyengine_us_version']})")
+        return
+
+    old = load_snapshot(args.old)
+    new = load_snapshot(args.new)
+    if old["year"] != new["year"]:
+        parser.error(f"snapshots are for different years ({old['year']}, {new['year']})")
+    changes = diff_snapshots(old, new)
+    print(
+        f"policyengine-us {old['policyengine_us_version']} -> {new['policyengine_us_version']}: "
+        f"{len(changes)} of {len(new['files'])} state files changed",
+        file=sys.stderr,
+    )
+    for name, change in changes.items():
+        if "error" in change:
+            print(f"  {name}: {change['error']}", file=sys.stderr)
+            continue
+        shown = change["variables"][:3] + change["parameters"][:3]
+        more = len(change["variables"]) + len(change["parameters"]) - len(shown)
+        print(f"  {name}: {', '.join(shown)}{f' (+{more} more)' if more > 0 else ''}", file=sys.stderr)
+
+    files = ",".join(changes)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(files + "\n")
+    if files:
+        print(f"python precompute.py --files {files}")
+
+
+if __name__ == "__main__":
+    main()
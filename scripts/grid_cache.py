@@ -0,0 +1,374 @@
+#!/usr/bin/env python3
+"""
+Compute-on-miss cache for config grids outside the precompute.
+
+Precomputed grids (ADULTS_RANGE x CHILDREN_RANGE x ENROLLED_VALUES, $0-$3,000
+a month) are served from the static files. Any other household config, child
+ages, year or income range is computed on first request as one batched
+simulation over the whole grid, stored under CACHE_DIR/grids and served from
+there afterwards. Stored grids are evicted least recently used first once
+they exceed a size budget.
+
+`serve` runs a local stand-in for the cache service (threaded HTTP):
+
+    GET /grid?file=CA_1&adults=3&children=2&enrolled=false
+        [&year=2025&child_ages=2,9&earned_max=5000&unearned_max=3000]
+    GET /tanf?state=CA&county=...&adults=3&children=2&earned=24000[&unearned=...]
+    GET /cliffs?state=CA&county=...&adults=1&children=2
+        (calculator.get_cliff_analysis; 404 without ``precompute.py --cliffs``)
+
+Usage:
+    python grid_cache.py serve --port 8766 --max-mb 200
+    python grid_cache.py grid NY 1 9        # compute (or read) one grid
+"""
+
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+import grids
+from calculator import _policyengine_version, get_cliff_analysis
+from config import CACHE_DIR, DEFAULT_CHILD_AGE, PILOT_STATES
+
+GRID_CACHE_DIR = os.path.join(CACHE_DIR, "grids")
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+# Grids extended past the precomputed income range grow in steps of this ($/mo)
+EXTENSION_STEP = 1000
+
+
+def _extent(income_max: float | None, grid_max: float) -> int:
+    """Top of the income axis ($/mo) for a grid covering `income_max`."""
+    if income_max is None or income_max <= grid_max:
+        return int(grid_max)
+    return int(-(-income_max // EXTENSION_STEP) * EXTENSION_STEP)
+
+
+class GridCache:
+    """
+    Config grids from the precompute, the on-disk cache or a new simulation.
+
+    Grids use the precompute's income step; only their extent varies. Safe
+    to share between threads: concurrent misses for the same grid run one
+    simulation.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, directory: str = GRID_CACHE_DIR):
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._computing = {}
+
+    def grid(
+        self,
+        name: str,
+        year: int,
+        num_adults: int,
+        num_children: int,
+        is_tanf_enrolled: bool = False,
+        child_ages: list[int] | None = None,
+        earned_max: float | None = None,
+        unearned_max: float | None = None,
+    ) -> dict:
+        """
+        One config grid of monthly benefits for a state file.
+
+        `earned_max` and `unearned_max` ($/mo) extend the grid past the
+        precomputed range when needed. Returns {"grid": rows by earned
+        income, "earned_steps": [...], "unearned_steps": [...], "source":
+        "precomputed", "cache" or "computed"}.
+        """
+        metadata = grids.load_metadata()
+        earned_top = _extent(earned_max, metadata["earned_steps"][-1])
+        unearned_top = _extent(unearned_max, metadata["unearned_steps"][-1])
+        if child_ages is not None and all(age == DEFAULT_CHILD_AGE for age in child_ages):
+            child_ages = None
+
+        # Files of a progressive run that hasn't reached the grid step yet
+        # are mostly interpolated, so they aren't served as precomputed
+        if (
+            year == metadata["year"]
+            and earned_top == metadata["earned_steps"][-1]
+            and unearned_top == metadata["unearned_steps"][-1]
+            and grids.lattice_stride(name) == 1
+        ):
+            key = grids.band_config_key(name, num_adults, num_children, is_tanf_enrolled, child_ages)
+            try:
+                grid = grids.load_state_data(name).get(key) if key else None
+            except OSError:
+                grid = None
+            if grid is not None:
+                return {
+                    "grid": grid,
+                    "earned_steps": metadata["earned_steps"],
+                    "unearned_steps": metadata["unearned_steps"],
+                    "source": "precomputed",
+                }
+
+        request = {
+            # Grids from another policyengine-us version are never served
+            "policyengine_us_version": _policyengine_version(),
+            "name": name,
+            "year": year,
+            "num_adults": num_adults,
+            "num_children": num_children,
+            "is_tanf_enrolled": is_tanf_enrolled,
+            "child_ages": child_ages,
+            "earned_max": earned_top,
+            "unearned_max": unearned_top,
+        }
+        path = self._path(request)
+        result = self._read(path)
+        if result is not None:
+            return {**result, "source": "cache"}
+
+        # Single flight: the first thread to miss computes, the rest wait
+        with self._lock:
+            event = self._computing.get(path)
+            owner = event is None
+            if owner:
+                event = self._computing[path] = threading.Event()
+        if not owner:
+            event.wait()
+            result = self._read(path)
+            if result is not None:
+                return {**result, "source": "cache"}
+        try:
+            result = compute_grid(request, metadata["earned_steps"][1] - metadata["earned_steps"][0])
+            self._write(path, result)
+        finally:
+            if owner:
+                with self._lock:
+                    del self._computing[path]
+                event.set()
+        return {**result, "source": "computed"}
+
+    def lookup(
+        self,
+        state: str,
+        year: int,
+        num_adults: int,
+        num_children: int,
+        earned_income: float,
+        unearned_income: float = 0,
+        child_ages: list[int] | None = None,
+        county: str | None = None,
+        is_tanf_enrolled: bool = False,
+    ) -> dict:
+        """TANF benefit for one household (annual incomes), interpolated from its grid."""
+        import numpy as np
+
+        earned_monthly = earned_income / 12
+        unearned_monthly = unearned_income / 12
+        result = self.grid(
+            grids.output_name(state, county), year, num_adults, num_children,
+            is_tanf_enrolled, child_ages, earned_monthly, unearned_monthly,
+        )
+        grid = np.asarray(result["grid"], dtype=float)
+        monthly = int(grids.interpolate(
+            grid, earned_monthly, unearned_monthly,
+            steps=(result["earned_steps"], result["unearned_steps"]),
+        ))
+        return {
+            "tanf_monthly": monthly,
+            "tanf_annual": monthly * 12,
+            "eligible": monthly > 0,
+            "state": state,
+            "state_name": PILOT_STATES.get(state, state),
+            "year": year,
+            "source": result["source"],
+        }
+
+    def _path(self, request: dict) -> str:
+        digest = hashlib.sha256(json.dumps(request, sort_keys=True).encode()).hexdigest()[:16]
+        return os.path.join(self.directory, f"{request['year']}_{request['name']}_{digest}.json")
+
+    def _read(self, path: str) -> dict | None:
+        try:
+            with open(path) as f:
+                result = json.load(f)
+        except (OSError, ValueError):
+            return None
+        # The modification time is the LRU clock
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return result
+
+    def _write(self, path: str, result: dict):
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(result, f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+        self.evict()
+
+    def evict(self):
+        """Remove least recently used grids until the cache fits max_bytes."""
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".json"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except FileNotFoundError:
+                pass
+
+
+def compute_grid(request: dict, step: int) -> dict:
+    """Simulate every cell of a requested grid in one batched simulation."""
+    from calculator import _calculate_tanf_amounts
+    from precompute import state_files
+
+    counties = {name: (state_code, county) for state_code, county, name in state_files()}
+    if request["name"] not in counties:
+        raise ValueError(f"Unknown state file: {request['name']}")
+    state_code, county = counties[request["name"]]
+    earned_steps = list(range(0, request["earned_max"] + 1, step))
+    unearned_steps = list(range(0, request["unearned_max"] + 1, step))
+    amounts = _calculate_tanf_amounts(state_code, request["year"], [
+        {
+            "num_adults": request["num_adults"],
+            "num_children": request["num_children"],
+            "earned_income": earned * 12,
+            "unearned_income": unearned * 12,
+            "child_ages": request["child_ages"],
+            "county": county,
+            "is_tanf_enrolled": request["is_tanf_enrolled"],
+        }
+        for earned in earned_steps
+        for unearned in unearned_steps
+    ])
+    width = len(unearned_steps)
+    return {
+        "grid": [
+            [round(amount / 12) for amount in amounts[i * width:(i + 1) * width]]
+            for i in range(len(earned_steps))
+        ],
+        "earned_steps": earned_steps,
+        "unearned_steps": unearned_steps,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Local service stand-in
+# ---------------------------------------------------------------------------
+
+def _ages(value: str | None) -> list[int] | None:
+    return [int(age) for age in value.split(",")] if value else None
+
+
+def serve(port: int, cache: GridCache):
+    """Serve GET /grid, GET /tanf and GET /cliffs on localhost from `cache`."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from urllib.parse import parse_qs, urlparse
+
+    metadata = grids.load_metadata()
+
+    class Handler(BaseHTTPRequestHandler):
+        def _reply(self, status, body):
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            # The frontend is served from another origin in development
+            self.send_header("Access-Control-Allow-Origin", "*")
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+            try:
+                year = int(query.get("year", metadata["year"]))
+                common = {
+                    "num_adults": int(query["adults"]),
+                    "num_children": int(query["children"]),
+                    "is_tanf_enrolled": query.get("enrolled", "false") == "true",
+                    "child_ages": _ages(query.get("child_ages")),
+                }
+                if url.path == "/grid":
+                    body = cache.grid(
+                        query["file"], year, **common,
+                        earned_max=float(query.get("earned_max", 0)),
+                        unearned_max=float(query.get("unearned_max", 0)),
+                    )
+                elif url.path == "/cliffs":
+                    body = get_cliff_analysis(
+                        query["state"], common["num_adults"], common["num_children"],
+                        county=query.get("county"), is_tanf_enrolled=common["is_tanf_enrolled"],
+                    )
+                    if body is None:
+                        self._reply(404, {"error": "no cliff map for this household"})
+                        return
+                elif url.path == "/tanf":
+                    body = cache.lookup(
+                        query["state"], year, **common,
+                        earned_income=float(query.get("earned", 0)),
+                        unearned_income=float(query.get("unearned", 0)),
+                        county=query.get("county"),
+                    )
+                else:
+                    self._reply(404, {"error": "not found"})
+                    return
+            except (KeyError, ValueError) as e:
+                self._reply(400, {"error": f"{type(e).__name__}: {e}"})
+                return
+            except Exception as e:
+                self._reply(500, {"error": type(e).__name__})
+                return
+            self._reply(200, body)
+
+        def log_message(self, *args):
+            pass
+
+    print(f"Grid cache on http://127.0.0.1:{port} ({cache.directory}, {cache.max_bytes // (1024 * 1024)} MB)")
+    ThreadingHTTPServer(("127.0.0.1", port), Handler).serve_forever()
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--max-mb", type=float, default=DEFAULT_MAX_BYTES / (1024 * 1024),
+                        help="Size budget of the on-disk cache")
+    commands = parser.add_subparsers(dest="command", required=True)
+    server = commands.add_parser("serve", help="Run the local cache service")
+    server.add_argument("--port", type=int, default=8766)
+    one = commands.add_parser("grid", help="Print where one grid comes from and its $0 benefit")
+    one.add_argument("file", help="State file, e.g. NY or CA_1")
+    one.add_argument("adults", type=int)
+    one.add_argument("children", type=int)
+    one.add_argument("--enrolled", action="store_true")
+    one.add_argument("--year", type=int)
+    one.add_argument("--child-ages", help="Comma-separated child ages")
+    args = parser.parse_args()
+
+    cache = GridCache(max_bytes=int(args.max_mb * 1024 * 1024))
+    if args.command == "serve":
+        serve(args.port, cache)
+        return
+    result = cache.grid(
+        args.file.upper(), args.year or grids.load_metadata()["year"],
+        args.adults, args.children, args.enrolled, _ages(args.child_ages),
+    )
+    print(
+        f"{args.file.upper()} {args.adults}_{args.children}: {result['source']}, "
+        f"{len(result['earned_steps'])}x{len(result['unearned_steps'])} grid, "
+        f"${result['grid'][0][0]}/mo at $0 income"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,296 @@
+"""
+Read access to the precomputed state data written by precompute.py.
+
+Mirrors the file layout frontend/src/dataLookup.js reads, so Python callers
+can answer from the static files without running simulations.
+"""
+import json
+import os
+from functools import lru_cache
+
+from config import CA_COUNTIES, PA_COUNTIES, VA_COUNTIES, DEFAULT_CHILD_AGE
+
+DATA_DIR = os.path.join(
+    os.path.dirname(__file__), "..", "frontend", "public", "data"
+)
+
+# County enum -> county group, for states whose grids are split by group
+COUNTY_GROUPS = {
+    "CA": {enum_name: group for enum_name, _, group in CA_COUNTIES},
+    "PA": {enum_name: group for enum_name, _, group in PA_COUNTIES},
+    "VA": {enum_name: group for enum_name, _, group in VA_COUNTIES},
+}
+
+# Group used when no county is given (same defaults as the state comparison)
+DEFAULT_GROUPS = {"CA": 1, "PA": 2, "VA": 2}
+
+
+def output_name(state: str, county: str | None = None) -> str:
+    """File name (without extension) holding a state's grids, e.g. "CA_1"."""
+    if state not in COUNTY_GROUPS:
+        return state
+    group = COUNTY_GROUPS[state].get(county, DEFAULT_GROUPS[state])
+    return f"{state}_{group}"
+
+
+def config_key(num_adults: int, num_children: int, enrolled: bool) -> str:
+    """Grid key for a household config, e.g. "1_2_false"."""
+    return f"{num_adults}_{num_children}_{str(enrolled).lower()}"
+
+
+def band_config_key(
+    name: str,
+    num_adults: int,
+    num_children: int,
+    enrolled: bool,
+    child_ages: list[int] | None = None,
+) -> str | None:
+    """
+    Grid key for a household with specific child ages.
+
+    Maps each child's age onto the state file's probed age bands (metadata
+    "age_bands", from ``precompute.py --age-bands``). Returns None when the
+    children fall into different bands, or when ages other than the default
+    are given for a file without band data, since no grid matches exactly.
+    """
+    key = config_key(num_adults, num_children, enrolled)
+    if not child_ages or not num_children:
+        return key
+    bands = load_metadata().get("age_bands", {}).get(name)
+    if bands is None:
+        return key if all(age == DEFAULT_CHILD_AGE for age in child_ages) else None
+
+    matched = set()
+    for age in child_ages:
+        for band in bands:
+            if band["min_age"] <= age and (band["max_age"] is None or age <= band["max_age"]):
+                matched.add(band["min_age"])
+                break
+    if len(matched) != 1:
+        return None
+    band = next(band for band in bands if band["min_age"] in matched)
+    return key if band["age"] == DEFAULT_CHILD_AGE else f"{key}_age{band['min_age']}"
+
+
+@lru_cache(maxsize=None)
+def _load_json(path: str):
+    with open(path) as f:
+        return json.load(f)
+
+
+def load_metadata() -> dict:
+    return _load_json(os.path.join(DATA_DIR, "metadata.json"))
+
+
+def load_state_data(name: str) -> dict:
+    """All grids for one state file, keyed by config_key()."""
+    return _load_json(os.path.join(DATA_DIR, f"{name}.json"))
+
+
+def load_year_data(name: str, year: int) -> dict:
+    """
+    All grids for one state file in a given year.
+
+    Metadata "year" is the current <name>.json. Other years are read from
+    years/<year>/ (``precompute.py --years``), where a grid shared with
+    another year is stored as that year's number, which refers to that
+    year's file under years/ too.
+    """
+    if year == load_metadata()["year"]:
+        return load_state_data(name)
+    return _load_years_file(name, year)
+
+
+def _load_years_file(name: str, year: int) -> dict:
+    data = _load_json(os.path.join(DATA_DIR, "years", str(year), f"{name}.json"))
+    return {
+        key: _load_years_file(name, grid)[key] if isinstance(grid, int) else grid
+        for key, grid in data.items()
+    }
+
+
+def load_cliff_map(name: str) -> dict | None:
+    """
+    Marginal rates and cliffs for one state file, if metadata "cliff_files"
+    lists it (a cliff map left from an earlier run doesn't match a rewritten
+    state file).
+    """
+    if name not in load_metadata().get("cliff_files", []):
+        return None
+    return _load_json(os.path.join(DATA_DIR, f"{name}.cliffs.json"))
+
+
+def load_curves(name: str) -> dict | None:
+    """
+    Exact axis curves ({key: {"earned": [...], "unearned": [...]}}) for one
+    state file, if metadata "curve_files" lists it (a curves file left from
+    an earlier run doesn't match a rewritten state file).
+    """
+    if name not in load_metadata().get("curve_files", []):
+        return None
+    return _load_json(os.path.join(DATA_DIR, f"{name}.curves.json"))
+
+
+def axis_lookup(
+    name: str, key: str, earned_monthly: float, unearned_monthly: float
+) -> tuple[float, float, float] | None:
+    """
+    Benefit from the exact axis curves when one of the incomes is $0.
+
+    Interpolates linearly between the curve's two points around the income
+    and returns (monthly benefit, lower point, upper point), or None when
+    the household isn't on an axis, is past the curve's end, or the state
+    file has no curves.
+    """
+    if earned_monthly and unearned_monthly:
+        return None
+    curve = (load_curves(name) or {}).get(key)
+    if curve is None:
+        return None
+    step = load_metadata()["curve_step"]
+    values = curve["unearned"] if unearned_monthly else curve["earned"]
+    income = unearned_monthly or earned_monthly
+    if not 0 <= income <= step * (len(values) - 1):
+        return None
+    index = min(int(income // step), len(values) - 2)
+    low, high = values[index], values[index + 1]
+    frac = (income - index * step) / step
+    # Math.round semantics, like interpolate()
+    monthly = float(int(max(0, low + (high - low) * frac) + 0.5))
+    if frac == 0:
+        high = low
+    elif frac == 1:
+        low = high
+    return monthly, min(low, high), max(low, high)
+
+
+def load_program_data(name: str) -> dict | None:
+    """
+    Extra program channels ({key: {program: grid}}) for one state file.
+
+    Only files listed in metadata "program_files" are read: a side file left
+    from an earlier run no longer matches a rewritten state file.
+    """
+    if name not in load_metadata().get("program_files", []):
+        return None
+    return _load_json(os.path.join(DATA_DIR, f"{name}.programs.json"))
+
+
+def lookup_programs(
+    name: str, key: str, earned_monthly: float, unearned_monthly: float
+) -> dict | None:
+    """
+    Interpolated monthly amount of every stored program for one household.
+
+    Returns {"tanf_monthly": ..., "<program>_monthly": ...,
+    "total_benefits_monthly": ...} like the points of
+    calculator.calculate_combined_benefits_over_income_range, or None if
+    the TANF grid is missing.
+    """
+    import numpy as np
+
+    grid = grid_array(name, key)
+    if grid is None:
+        return None
+    channels = (load_program_data(name) or {}).get(key, {})
+    result = {"tanf_monthly": float(interpolate(grid, earned_monthly, unearned_monthly))}
+    for program, channel in channels.items():
+        result[f"{program}_monthly"] = float(
+            interpolate(np.asarray(channel, dtype=float), earned_monthly, unearned_monthly)
+        )
+    result["total_benefits_monthly"] = sum(result.values())
+    return result
+
+
+@lru_cache(maxsize=None)
+def grid_array(name: str, key: str):
+    """One config grid as a NumPy array, or None if it isn't precomputed."""
+    import numpy as np
+
+    try:
+        grid = load_state_data(name).get(key)
+    except OSError:
+        return None
+    return None if grid is None else np.asarray(grid, dtype=float)
+
+
+def _cells(earned_monthly, unearned_monthly, steps=None):
+    """
+    Lower grid indices and fractional offsets of each income point's cell.
+
+    `steps` is (earned steps, unearned steps) for grids whose axes differ
+    from the precompute's (default: the metadata's).
+    """
+    import numpy as np
+
+    if steps is None:
+        metadata = load_metadata()
+        steps = metadata["earned_steps"], metadata["unearned_steps"]
+    earned_steps = np.asarray(steps[0], dtype=float)
+    unearned_steps = np.asarray(steps[1], dtype=float)
+    earned_step = earned_steps[1] - earned_steps[0]
+    unearned_step = unearned_steps[1] - unearned_steps[0]
+
+    earned = np.clip(np.asarray(earned_monthly, dtype=float), 0, earned_steps[-1])
+    unearned = np.clip(np.asarray(unearned_monthly, dtype=float), 0, unearned_steps[-1])
+
+    e0 = np.minimum((earned // earned_step).astype(int), len(earned_steps) - 2)
+    u0 = np.minimum((unearned // unearned_step).astype(int), len(unearned_steps) - 2)
+    e_frac = np.clip((earned - earned_steps[e0]) / earned_step, 0, 1)
+    u_frac = np.clip((unearned - unearned_steps[u0]) / unearned_step, 0, 1)
+    return e0, u0, e_frac, u_frac
+
+
+def interpolate(grid, earned_monthly, unearned_monthly, steps=None):
+    """
+    Vectorized bilinear interpolation on one config grid.
+
+    Same clamping and rounding as interpolate2D in dataLookup.js, applied
+    to arrays of monthly incomes at once. Returns monthly benefits.
+    `steps` gives the grid's own axes (see _cells).
+    """
+    import numpy as np
+
+    e0, u0, e_frac, u_frac = _cells(earned_monthly, unearned_monthly, steps)
+    v0 = grid[e0, u0] + (grid[e0, u0 + 1] - grid[e0, u0]) * u_frac
+    v1 = grid[e0 + 1, u0] + (grid[e0 + 1, u0 + 1] - grid[e0 + 1, u0]) * u_frac
+    # Math.round semantics (half up), not NumPy's round-half-even
+    return np.floor(np.maximum(0, v0 + (v1 - v0) * e_frac) + 0.5)
+
+
+def cell_range(grid, earned_monthly, unearned_monthly, stride=1):
+    """
+    (min, max) of the grid values around each income point.
+
+    Only corners the point actually lies between count, so a point exactly
+    on a grid node gets that node's value for both. With `stride` > 1 (see
+    lattice_stride) only every stride-th node was simulated and the rest
+    are interpolated, so the corners are those of the simulated cell.
+    """
+    import numpy as np
+
+    e0, u0, e_frac, u_frac = _cells(earned_monthly, unearned_monthly)
+    last_e = grid.shape[0] - 1
+    last_u = grid.shape[1] - 1
+    e_pos = e0 + e_frac
+    u_pos = u0 + u_frac
+    # The last node is always simulated, even off the stride
+    e_lo = np.where(e_pos >= last_e, last_e, (e_pos // stride * stride).astype(int))
+    u_lo = np.where(u_pos >= last_u, last_u, (u_pos // stride * stride).astype(int))
+    e_hi = np.where(e_pos > e_lo, np.minimum(e_lo + stride, last_e), e_lo)
+    u_hi = np.where(u_pos > u_lo, np.minimum(u_lo + stride, last_u), u_lo)
+    corners = np.stack([grid[e_lo, u_lo], grid[e_lo, u_hi], grid[e_hi, u_lo], grid[e_hi, u_hi]])
+    return corners.min(axis=0), corners.max(axis=0)
+
+
+def lattice_stride(name: str) -> int:
+    """
+    Grid steps between simulated nodes of a state file.
+
+    1 for a full-resolution file; larger while a ``precompute.py
+    --progressive`` run has only reached a coarser level (metadata
+    "resolution"), in which case the nodes in between are interpolated.
+    """
+    metadata = load_metadata()
+    step = metadata["earned_steps"][1] - metadata["earned_steps"][0]
+    return max(1, int(metadata.get("resolution", {}).get(name, step) // step))
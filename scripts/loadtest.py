@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""
+Load test for the calculator entry points under concurrent requests.
+
+Replays a mix of household queries (synthetic, or recorded as JSON lines)
+against calculate_tanf, calculate_tanf_over_income_range and
+calculate_combined_benefits_over_income_range. `--concurrency` clients each
+send requests back to back, served by one of three backends:
+
+    threads     calls the calculator in this process (shares the GIL)
+    processes   a process pool with one worker per client
+    http        a local HTTP stand-in server (threaded) in a child process
+
+Reports p50/p95/p99 latency per endpoint, throughput and peak RSS of the
+process(es) doing the work, to size worker pools from measurements.
+
+Usage:
+    python loadtest.py --mode threads --concurrency 4 --requests 200
+    python loadtest.py --mode processes --concurrency 8 --record mix.jsonl
+    python loadtest.py --mode http --concurrency 16 --queries mix.jsonl --json out.json
+"""
+
+import json
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from config import PILOT_STATES, CA_COUNTIES, PA_COUNTIES, VA_COUNTIES, DEFAULT_YEAR
+from telemetry import _rss_bytes
+
+# Query name -> calculator function
+ENDPOINTS = {
+    "calculate_tanf": "calculate_tanf",
+    "range": "calculate_tanf_over_income_range",
+    "combined": "calculate_combined_benefits_over_income_range",
+}
+# Share of each endpoint in the synthetic mix (single lookups dominate)
+ENDPOINT_WEIGHTS = {"calculate_tanf": 0.8, "range": 0.15, "combined": 0.05}
+# Relative frequency of household sizes in the synthetic mix
+CHILDREN_WEIGHTS = [0.1, 0.35, 0.3, 0.15, 0.06, 0.04]
+COUNTIES = {
+    "CA": [code for code, _, _ in CA_COUNTIES],
+    "PA": [code for code, _, _ in PA_COUNTIES],
+    "VA": [code for code, _, _ in VA_COUNTIES],
+}
+
+
+def synthetic_queries(count: int, seed: int = 0) -> list[dict]:
+    """
+    A reproducible mix of `count` queries across states and endpoints.
+
+    Mostly low-income families, about a third with some unearned income,
+    as {"endpoint": ..., "args": {calculator keyword arguments}}.
+    """
+    rng = random.Random(seed)
+    states = sorted(PILOT_STATES)
+    endpoints = list(ENDPOINT_WEIGHTS)
+    queries = []
+    for _ in range(count):
+        state = rng.choice(states)
+        args = {
+            "state": state,
+            "year": DEFAULT_YEAR,
+            "num_adults": rng.choice([1, 1, 1, 2]),
+            "num_children": rng.choices(range(len(CHILDREN_WEIGHTS)), CHILDREN_WEIGHTS)[0],
+            "earned_income": round(rng.uniform(0, 40000), -2) if rng.random() < 0.7 else 0,
+            "unearned_income": round(rng.uniform(0, 12000), -2) if rng.random() < 0.3 else 0,
+        }
+        if state in COUNTIES:
+            args["county"] = rng.choice(COUNTIES[state])
+        endpoint = rng.choices(endpoints, [ENDPOINT_WEIGHTS[e] for e in endpoints])[0]
+        if endpoint != "calculate_tanf":
+            args["income_max"] = 40000
+        queries.append({"endpoint": endpoint, "args": args})
+    return queries
+
+
+def load_queries(path: str) -> list[dict]:
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def run_query(query: dict):
+    """Run one query in this process and return the calculator's result."""
+    import calculator
+
+    return getattr(calculator, ENDPOINTS[query["endpoint"]])(**query["args"])
+
+
+def _timed_query(query: dict) -> str | None:
+    """run_query() for a pool worker: the error type, or None on success."""
+    try:
+        run_query(query)
+        return None
+    except Exception as e:
+        return type(e).__name__
+
+
+def _pool_query(query: dict) -> tuple[str | None, int]:
+    """_timed_query() plus the worker's peak RSS, which the parent can't see."""
+    return _timed_query(query), _rss_bytes()[1]
+
+
+# ---------------------------------------------------------------------------
+# HTTP stand-in
+# ---------------------------------------------------------------------------
+
+def serve(port: int):
+    """Serve POST /query (a query as JSON) and GET /rss on localhost."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def _reply(self, status, body):
+            data = json.dumps(body, default=str).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            current, peak = _rss_bytes()
+            self._reply(200, {"rss_bytes": current, "peak_rss_bytes": peak})
+
+        def do_POST(self):
+            query = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            try:
+                self._reply(200, run_query(query))
+            except Exception as e:
+                self._reply(500, {"error": type(e).__name__})
+
+        def log_message(self, *args):
+            pass
+
+    ThreadingHTTPServer(("127.0.0.1", port), Handler).serve_forever()
+
+
+def _http(port: int, method: str, path: str, body=None):
+    import urllib.request
+
+    request = urllib.request.Request(
+        f"http://127.0.0.1:{port}{path}",
+        data=None if body is None else json.dumps(body).encode(),
+        method=method,
+        headers={"Content-Type": "application/json"},
+    )
+    with urllib.request.urlopen(request, timeout=600) as response:
+        return json.loads(response.read())
+
+
+def _start_server(port: int):
+    from multiprocessing import Process
+
+    server = Process(target=serve, args=(port,), daemon=True)
+    server.start()
+    for _ in range(100):
+        try:
+            _http(port, "GET", "/rss")
+            return server
+        except OSError:
+            time.sleep(0.05)
+    server.terminate()
+    raise RuntimeError(f"HTTP stand-in didn't start on port {port}")
+
+
+# ---------------------------------------------------------------------------
+# Driver
+# ---------------------------------------------------------------------------
+
+def _percentile(ordered: list[float], pct: float) -> float:
+    """Nearest-rank percentile of a sorted list."""
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
+
+
+def _summarize(latencies: list[float]) -> dict:
+    ordered = sorted(latencies)
+    if not ordered:
+        return {"count": 0}
+    return {
+        "count": len(ordered),
+        "p50_ms": round(_percentile(ordered, 50) * 1000, 1),
+        "p95_ms": round(_percentile(ordered, 95) * 1000, 1),
+        "p99_ms": round(_percentile(ordered, 99) * 1000, 1),
+        "max_ms": round(ordered[-1] * 1000, 1),
+    }
+
+
+def run_load(queries: list[dict], mode: str, concurrency: int, warmup: int = 0, port: int = 8765) -> dict:
+    """
+    Replay `queries` from `concurrency` closed-loop clients against a backend.
+
+    The first `warmup` queries per backend process are run first and not
+    measured, so policyengine-us loading doesn't count as request latency.
+    Returns the report printed by main().
+    """
+    server = None
+    pool = None
+    if mode == "threads":
+        def call(query):
+            return _timed_query(query)
+    elif mode == "processes":
+        from calculator import warm_process_context
+
+        pool = ProcessPoolExecutor(max_workers=concurrency, mp_context=warm_process_context())
+        # Workers are forked by the forkserver, not by us, so they report
+        # their own peak RSS with every result
+        pool_peaks = [0]
+
+        def call(query):
+            error, peak = pool.submit(_pool_query, query).result()
+            pool_peaks[0] = max(pool_peaks[0], peak)
+            return error
+    elif mode == "http":
+        import urllib.error
+
+        server = _start_server(port)
+
+        def call(query):
+            try:
+                _http(port, "POST", "/query", query)
+                return None
+            except urllib.error.HTTPError as e:
+                return json.loads(e.read()).get("error", "HTTPError")
+            except OSError as e:
+                # Refused connections and timeouts count as errors, not crashes
+                return type(e).__name__
+    else:
+        raise ValueError(f"Unknown mode: {mode}")
+
+    # Warm up every backend process (each pool worker gets its own share)
+    warm = queries[:warmup]
+    if warm:
+        if pool is not None:
+            list(pool.map(_timed_query, warm * concurrency))
+        else:
+            for query in warm:
+                call(query)
+    rss_before = _rss_bytes()[0]
+
+    pending = iter(queries)
+    lock = threading.Lock()
+    results = []
+
+    def client():
+        while True:
+            with lock:
+                query = next(pending, None)
+            if query is None:
+                return
+            started = time.perf_counter()
+            error = call(query)
+            elapsed = time.perf_counter() - started
+            with lock:
+                results.append((query["endpoint"], elapsed, error))
+
+    start = time.perf_counter()
+    clients = [threading.Thread(target=client) for _ in range(concurrency)]
+    for thread in clients:
+        thread.start()
+    for thread in clients:
+        thread.join()
+    wall = time.perf_counter() - start
+
+    if mode == "http":
+        worker_peak = _http(port, "GET", "/rss")["peak_rss_bytes"]
+        server.terminate()
+        server.join()
+    elif mode == "processes":
+        pool.shutdown()
+        worker_peak = pool_peaks[0]
+    else:
+        worker_peak = _rss_bytes()[1]
+
+    errors = {}
+    for _, _, error in results:
+        if error:
+            errors[error] = errors.get(error, 0) + 1
+    return {
+        "mode": mode,
+        "concurrency": concurrency,
+        "requests": len(results),
+        "wall_seconds": round(wall, 2),
+        "throughput_rps": round(len(results) / max(wall, 1e-9), 2),
+        "latency": _summarize([elapsed for _, elapsed, _ in results]),
+        "latency_by_endpoint": {
+            endpoint: _summarize([elapsed for name, elapsed, _ in results if name == endpoint])
+            for endpoint in ENDPOINTS
+        },
+        "errors": errors,
+        "harness_rss_bytes_after_warmup": rss_before,
+        "harness_peak_rss_bytes": _rss_bytes()[1],
+        "worker_peak_rss_bytes": worker_peak,
+    }
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--mode", choices=["threads", "processes", "http"], default="threads")
+    parser.add_argument("--concurrency", type=int, default=4, help="Concurrent clients")
+    parser.add_argument("--requests", type=int, default=200, help="Synthetic queries to send")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the synthetic mix")
+    parser.add_argument("--queries", help="Replay recorded queries (JSON lines) instead")
+    parser.add_argument("--record", help="Write the queries used to this JSON lines file")
+    parser.add_argument("--warmup", type=int, default=2, help="Unmeasured queries per backend process")
+    parser.add_argument("--port", type=int, default=8765, help="Port of the HTTP stand-in")
+    parser.add_argument("--json", help="Also write the report as JSON")
+    args = parser.parse_args()
+
+    queries = load_queries(args.queries) if args.queries else synthetic_queries(args.requests, args.seed)
+    if args.record:
+        with open(args.record, "w") as f:
+            f.writelines(json.dumps(query) + "\n" for query in queries)
+
+    report = run_load(queries, args.mode, max(1, args.concurrency), args.warmup, args.port)
+
+    mb = 1024 * 1024
+    latency = report["latency"]
+    print(
+        f"{report['mode']} x{report['concurrency']}: {report['requests']} requests in "
+        f"{report['wall_seconds']}s ({report['throughput_rps']} req/s)"
+    )
+    if latency["count"]:
+        print(f"  all            p50 {latency['p50_ms']} ms  p95 {latency['p95_ms']} ms  p99 {latency['p99_ms']} ms")
+    for endpoint, stats in report["latency_by_endpoint"].items():
+        if stats["count"]:
+            print(
+                f"  {endpoint:<14} p50 {stats['p50_ms']} ms  p95 {stats['p95_ms']} ms  "
+                f"p99 {stats['p99_ms']} ms  ({stats['count']})"
+            )
+    print(
+        f"  peak RSS: worker {report['worker_peak_rss_bytes'] / mb:.0f} MB, "
+        f"harness {report['harness_peak_rss_bytes'] / mb:.0f} MB"
+    )
+    if report["errors"]:
+        print(f"  errors: {report['errors']}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
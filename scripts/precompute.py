@@ -5,16 +5,41 @@ Outputs JSON files to frontend/public/data/ for fully static frontend.
 """
 
 import json
+import math
 import os
+import random
 import sys
+import tempfile
 import time
-from multiprocessing import Pool, cpu_count
+from multiprocessing import cpu_count
 
 # Add scripts dir to path (calculator.py and config.py live here)
 sys.path.insert(0, os.path.dirname(__file__))
 
-from calculator import _calculate_tanf_amount
-from config import PILOT_STATES, CA_COUNTIES, PA_COUNTIES, VA_COUNTIES
+from calculator import (
+    _amounts_isolating_failures,
+    _calculate_program_amounts,
+    _calculate_tanf_amounts,
+    _calculate_tanf_amounts_by_year,
+    PROGRAMS,
+    build_capability_registry,
+    find_breakeven_incomes,
+    find_income_invariant_variables,
+    is_demographically_eligible,
+    parameters_affected,
+    pruned_overrides,
+    trace_tanf_dependencies,
+    warm_process_context,
+)
+import telemetry
+from config import (
+    PILOT_STATES,
+    CA_COUNTIES,
+    PA_COUNTIES,
+    VA_COUNTIES,
+    DEFAULT_CHILD_AGE,
+    NON_MONOTONE_STATES,
+)
 
 # Grid configuration
 YEAR = 2025
@@ -23,6 +48,9 @@ UNEARNED_STEPS = list(range(0, 3001, 100))  # $0-$3000/mo in $100 steps (31 valu
 ADULTS_RANGE = [1, 2]
 CHILDREN_RANGE = list(range(0, 8))  # 0-7
 ENROLLED_VALUES = [False]
+# Exact benefit curves along each income axis (other income $0), $0-$3000/mo
+CURVE_STEP = 10
+CURVE_STEPS = list(range(0, 3001, CURVE_STEP))  # 301 values
 
 # Representative counties per region/group for precomputation
 CA_REGION_COUNTIES = {
@@ -45,11 +73,723 @@ VA_GROUP_COUNTIES = {
 OUTPUT_DIR = os.path.join(
     os.path.dirname(__file__), "..", "frontend", "public", "data"
 )
+REFORM_DIR = os.path.join(os.path.dirname(__file__), "..", "reforms")
+# benefits.npy/.npz written by --tensor
+TENSOR_DIR = os.path.join(os.path.dirname(__file__), "..", "tensor")
+
+# Precision ($/mo) to which cliff locations are refined by bisection
+CLIFF_TOLERANCE = 1
+
+
+def _refine_cliffs(state_code, county, num_adults, num_children, enrolled, brackets):
+    """
+    Bisect monthly-income brackets down to CLIFF_TOLERANCE.
+
+    Each bracket is (axis, fixed_monthly, lo, hi) with a positive benefit at
+    lo and none at hi along the given axis. All brackets advance together,
+    one batched simulation per bisection step (~7 steps for a $100 gap).
+    Returns the refined hi end of each bracket: the lowest monthly income
+    found with no benefit.
+    """
+    brackets = [list(bracket) for bracket in brackets]
+    while True:
+        active = [b for b in brackets if b[3] - b[2] > CLIFF_TOLERANCE]
+        if not active:
+            break
+        households = []
+        for axis, fixed, lo, hi in active:
+            mid = (lo + hi) / 2
+            earned, unearned = (mid, fixed) if axis == "earned" else (fixed, mid)
+            households.append({
+                "num_adults": num_adults,
+                "num_children": num_children,
+                "earned_income": earned * 12,
+                "unearned_income": unearned * 12,
+                "county": county,
+                "is_tanf_enrolled": enrolled,
+            })
+        amounts = _calculate_tanf_amounts(state_code, YEAR, households)
+        for bracket, amount in zip(active, amounts):
+            mid = (bracket[2] + bracket[3]) / 2
+            if round(amount / 12) > 0:
+                bracket[2] = mid
+            else:
+                bracket[3] = mid
+    return [round(bracket[3]) for bracket in brackets]
+
+
+def compute_cliff_map(state_code, county, num_adults, num_children, enrolled, benefits):
+    """
+    Derive marginal reduction rates and cliff locations from one config grid.
+
+    Rates are finite differences of the monthly benefit along each axis,
+    as TANF lost per extra dollar of income. Cliffs are, for each grid row,
+    the monthly income at which the benefit first reaches $0, refined past
+    the grid step by bisection (None if the row never drops from a positive
+    benefit to $0: always eligible or never eligible).
+    """
+    import numpy as np
+
+    grid = np.array(benefits, dtype=float)
+    earned_step = EARNED_STEPS[1] - EARNED_STEPS[0]
+    unearned_step = UNEARNED_STEPS[1] - UNEARNED_STEPS[0]
+    earned_rate = np.round(-np.diff(grid, axis=0) / earned_step, 3)
+    unearned_rate = np.round(-np.diff(grid, axis=1) / unearned_step, 3)
+
+    # Where a positive benefit is followed by $0 along each axis
+    positive = grid > 0
+    earned_drops = positive[:-1, :] & ~positive[1:, :]
+    unearned_drops = positive[:, :-1] & ~positive[:, 1:]
+
+    cliffs = {
+        "earned": [None] * len(UNEARNED_STEPS),
+        "unearned": [None] * len(EARNED_STEPS),
+    }
+    slots = []
+    brackets = []
+    for j, unearned in enumerate(UNEARNED_STEPS):
+        drops = np.flatnonzero(earned_drops[:, j])
+        if drops.size:
+            i = int(drops[0])
+            slots.append(("earned", j))
+            brackets.append(("earned", unearned, EARNED_STEPS[i], EARNED_STEPS[i + 1]))
+    for i, earned in enumerate(EARNED_STEPS):
+        drops = np.flatnonzero(unearned_drops[i, :])
+        if drops.size:
+            j = int(drops[0])
+            slots.append(("unearned", i))
+            brackets.append(("unearned", earned, UNEARNED_STEPS[j], UNEARNED_STEPS[j + 1]))
+
+    try:
+        refined = _refine_cliffs(
+            state_code, county, num_adults, num_children, enrolled, brackets
+        )
+    except Exception:
+        # Keep grid-resolution cliffs if the refinement simulations fail
+        refined = [hi for _, _, _, hi in brackets]
+    for (axis, index), cliff in zip(slots, refined):
+        cliffs[axis][index] = cliff
+
+    return {
+        "earned_rate": earned_rate.tolist(),
+        "unearned_rate": unearned_rate.tolist(),
+        "earned_cliffs": cliffs["earned"],
+        "unearned_cliffs": cliffs["unearned"],
+    }
+
+
+# Child ages probed for benefit differences. Consecutive ages that give
+# identical results across the probe households collapse into one band;
+# the band holding DEFAULT_CHILD_AGE keeps the plain grid keys.
+AGE_CANDIDATES = [0, 1, 2, 3, 5, 6, 12, 13, 16, 17, 18]
+
+# Probe households: (adults, children) configs x (earned, unearned) $/mo
+AGE_PROBE_CONFIGS = [(1, 1), (1, 3), (2, 2)]
+AGE_PROBE_INCOMES = [(0, 0), (500, 0), (0, 500), (1500, 0)]
+
+
+def probe_age_bands(state_code, county):
+    """
+    Find which child-age breakpoints change a state's TANF result.
+
+    Runs every AGE_CANDIDATES age (all children the same age) through a few
+    probe households in one batched simulation, then merges consecutive ages
+    with identical results. Returns bands as dicts with min_age, max_age
+    (None for the open-ended last band) and the representative age used to
+    compute that band's grids.
+    """
+    households = []
+    for age in AGE_CANDIDATES:
+        for num_adults, num_children in AGE_PROBE_CONFIGS:
+            for earned, unearned in AGE_PROBE_INCOMES:
+                households.append({
+                    "num_adults": num_adults,
+                    "num_children": num_children,
+                    "earned_income": earned * 12,
+                    "unearned_income": unearned * 12,
+                    "child_ages": [age] * num_children,
+                    "county": county,
+                })
+    amounts = _calculate_tanf_amounts(state_code, YEAR, households)
+    per_age = len(AGE_PROBE_CONFIGS) * len(AGE_PROBE_INCOMES)
+    signatures = [
+        tuple(round(amount / 12) for amount in amounts[i * per_age:(i + 1) * per_age])
+        for i in range(len(AGE_CANDIDATES))
+    ]
+
+    bands = []
+    for age, signature in zip(AGE_CANDIDATES, signatures):
+        if bands and bands[-1]["signature"] == signature:
+            bands[-1]["ages"].append(age)
+        else:
+            bands.append({"signature": signature, "ages": [age]})
+    result = []
+    for index, band in enumerate(bands):
+        ages = band["ages"]
+        next_band = bands[index + 1] if index + 1 < len(bands) else None
+        result.append({
+            "min_age": ages[0] if index else 0,
+            "max_age": next_band["ages"][0] - 1 if next_band else None,
+            "age": DEFAULT_CHILD_AGE if DEFAULT_CHILD_AGE in ages else ages[0],
+        })
+    return result
+
+
+# Incomes ($/mo) the probe households walk along the earned axis, the
+# unearned axis and the diagonal, as (earned, unearned) multipliers
+MONOTONE_PROBE_STEPS = list(range(0, 3001, 200))
+MONOTONE_PROBE_PATHS = [(1, 0), (0, 1), (1, 1)]
+
+
+def probe_monotone(state_code, county):
+    """
+    Whether a state's TANF benefit never rises with earned or unearned income.
+
+    Walks the AGE_PROBE_CONFIGS households along each MONOTONE_PROBE_PATHS
+    direction over MONOTONE_PROBE_STEPS in one batched simulation and
+    returns False as soon as any walk's benefit goes up.
+    """
+    households = [
+        {
+            "num_adults": num_adults,
+            "num_children": num_children,
+            "earned_income": income * earned * 12,
+            "unearned_income": income * unearned * 12,
+            "county": county,
+        }
+        for num_adults, num_children in AGE_PROBE_CONFIGS
+        for earned, unearned in MONOTONE_PROBE_PATHS
+        for income in MONOTONE_PROBE_STEPS
+    ]
+    monthly = [round(amount / 12) for amount in _calculate_tanf_amounts(state_code, YEAR, households)]
+    length = len(MONOTONE_PROBE_STEPS)
+    for start in range(0, len(monthly), length):
+        walk = monthly[start:start + length]
+        if any(later > earlier for earlier, later in zip(walk, walk[1:])):
+            return False
+    return True
+
+
+def _hoisted_overrides(options, state_code, county, num_adults, num_children, enrolled, child_ages=None):
+    """Income-invariant values for one config when --hoist is on, else None."""
+    if not options.get("hoist"):
+        return None
+    try:
+        return find_income_invariant_variables(
+            state_code, YEAR, num_adults, num_children,
+            child_ages=child_ages, county=county, is_tanf_enrolled=enrolled,
+        ) or None
+    except Exception:
+        return None
+
+
+def compute_grid(state_code, county, num_adults, num_children, enrolled,
+                 child_ages=None, overrides=None, monotone=False, programs=(),
+                 single_month=False, report_cells=True):
+    """
+    Compute one config's earned x unearned grid of monthly benefits.
+
+    `overrides` are hoisted income-invariant values (see
+    calculator.find_income_invariant_variables) injected into every cell.
+    With `monotone`, the benefit is assumed not to rise with either income,
+    so once a cell is $0 every cell with at least as much earned and
+    unearned income is set to $0 without simulating it.
+    `programs` (e.g. ["snap", "eitc"]) are read from the same simulations
+    as extra channels. `single_month` evaluates TANF for one month where
+    that's verified to match the full year (calculator.supports_single_month).
+    Finished rows are reported to telemetry unless `report_cells` is off.
+
+    Returns:
+        (benefits, {program: grid}, simulations run, errors,
+         skipped (i, j) cells)
+    """
+    benefits = []
+    channels = {program: [] for program in programs}
+    count = 0
+    errors = 0
+    skipped = []
+    # First unearned column known to be $0 in this and every later row
+    zero_from = len(UNEARNED_STEPS)
+
+    for i, earned_monthly in enumerate(EARNED_STEPS):
+        earned_annual = earned_monthly * 12
+        row = []
+        channel_rows = {program: [] for program in programs}
+
+        for j, unearned_monthly in enumerate(UNEARNED_STEPS):
+            unearned_annual = unearned_monthly * 12
+            if monotone and j >= zero_from:
+                row.append(0)
+                skipped.append((i, j))
+                continue
+            started = time.monotonic()
+            try:
+                amounts = _calculate_program_amounts(
+                    state=state_code,
+                    year=YEAR,
+                    num_adults=num_adults,
+                    num_children=num_children,
+                    earned_income=earned_annual,
+                    unearned_income=unearned_annual,
+                    child_ages=child_ages,
+                    county=county,
+                    is_tanf_enrolled=enrolled,
+                    overrides=overrides,
+                    programs=["tanf", *programs],
+                    single_month=single_month,
+                )
+                telemetry.record_simulation(time.monotonic() - started)
+                row.append(round(amounts["tanf"] / 12))
+                for program in programs:
+                    channel_rows[program].append(round(amounts[program] / 12))
+                if monotone and row[-1] == 0:
+                    zero_from = j
+            except Exception as e:
+                telemetry.record_simulation(time.monotonic() - started, type(e).__name__)
+                row.append(0)
+                for program in programs:
+                    channel_rows[program].append(0)
+                errors += 1
+
+            count += 1
+
+        benefits.append(row)
+        for program in programs:
+            channels[program].append(channel_rows[program])
+        if report_cells:
+            telemetry.record_cells(len(row))
+
+    return benefits, channels, count, errors, skipped
+
+
+# Skipped cells re-simulated per config to catch monotonicity violations:
+# this share of them, and at least MONOTONE_VERIFY_MIN
+MONOTONE_VERIFY_FRACTION = 0.02
+MONOTONE_VERIFY_MIN = 5
+
+
+def _verify_sample_size(skipped):
+    return min(skipped, max(MONOTONE_VERIFY_MIN, math.ceil(skipped * MONOTONE_VERIFY_FRACTION)))
+
+
+def compute_axis_curves(options, state_code, county, num_adults, num_children, enrolled):
+    """
+    Exact monthly benefit along both income axes of one config.
+
+    Earned income with no unearned income, and unearned with no earned, at
+    every CURVE_STEPS value, all in one batched simulation. Honors --hoist,
+    --prune and --single-month like compute_config_grid.
+
+    Returns:
+        ({"earned": [...], "unearned": [...]} or None if the simulation
+         failed, simulations run)
+    """
+    overrides = _hoisted_overrides(
+        options, state_code, county, num_adults, num_children, enrolled
+    )
+    if options.get("prune"):
+        overrides = pruned_overrides(state_code, YEAR, county, overrides)
+    household = {
+        "num_adults": num_adults,
+        "num_children": num_children,
+        "county": county,
+        "is_tanf_enrolled": enrolled,
+        "overrides": overrides,
+    }
+    # $0/$0 is on both axes; simulate it once
+    households = [
+        {**household, "earned_income": earned * 12, "unearned_income": 0}
+        for earned in CURVE_STEPS
+    ] + [
+        {**household, "earned_income": 0, "unearned_income": unearned * 12}
+        for unearned in CURVE_STEPS[1:]
+    ]
+    started = time.monotonic()
+    try:
+        amounts = _calculate_tanf_amounts(
+            state_code, YEAR, households, single_month=bool(options.get("single_month"))
+        )
+    except Exception as e:
+        telemetry.record_batch(time.monotonic() - started, len(households), type(e).__name__)
+        return None, 1
+    telemetry.record_batch(time.monotonic() - started, len(households))
+    monthly = [round(amount / 12) for amount in amounts]
+    earned = monthly[:len(CURVE_STEPS)]
+    return {"earned": earned, "unearned": earned[:1] + monthly[len(CURVE_STEPS):]}, 1
+
+
+def compute_config_grid(options, state_code, county, num_adults, num_children,
+                        enrolled, child_ages=None, programs=()):
+    """
+    One config grid, honoring the --hoist, --prune, --single-month and
+    --monotone options.
+
+    In monotone mode (for states not in NON_MONOTONE_STATES and passing
+    probe_monotone, see compute_state) a config that fails the
+    demographic-eligibility probe is all $0 without simulating its cells,
+    and $0-dominated cells are skipped (see compute_grid). A random sample
+    of skipped cells (_verify_sample_size) is then simulated. If any of them is
+    non-zero the assumption doesn't hold, so the config is recomputed in
+    full and a warning is printed. Skipping only holds for TANF, so
+    monotone mode is off when extra `programs` channels are requested; so is
+    --prune, which only preserves the TANF result.
+
+    Returns:
+        (benefits, {program: grid}, simulations run, errors)
+    """
+    overrides = _hoisted_overrides(
+        options, state_code, county, num_adults, num_children, enrolled, child_ages
+    )
+    if options.get("prune") and not programs:
+        overrides = pruned_overrides(state_code, YEAR, county, overrides, child_ages)
+    single_month = bool(options.get("single_month"))
+    monotone = (
+        options.get("monotone")
+        and not programs
+        and state_code not in NON_MONOTONE_STATES
+    )
+    if not monotone:
+        benefits, channels, count, errors, _ = compute_grid(
+            state_code, county, num_adults, num_children, enrolled,
+            child_ages=child_ages, overrides=overrides, programs=programs,
+            single_month=single_month,
+        )
+        return benefits, channels, count, errors
+
+    try:
+        eligible = is_demographically_eligible(
+            state_code, YEAR, num_adults, num_children,
+            child_ages=child_ages, county=county, is_tanf_enrolled=enrolled,
+        )
+    except Exception as e:
+        print(
+            f"  warning: {state_code} {num_adults}_{num_children}: eligibility probe "
+            f"failed ({type(e).__name__}), simulating every cell",
+            file=sys.stderr,
+        )
+        eligible = None
+    if eligible is False:
+        benefits = [[0] * len(UNEARNED_STEPS) for _ in EARNED_STEPS]
+        skipped = [(i, j) for i in range(len(EARNED_STEPS)) for j in range(len(UNEARNED_STEPS))]
+        count, errors = 1, 0
+    else:
+        benefits, _, count, errors, skipped = compute_grid(
+            state_code, county, num_adults, num_children, enrolled,
+            child_ages=child_ages, overrides=overrides, monotone=True,
+            single_month=single_month, report_cells=False,
+        )
+    # Cells count toward progress once, after the config's final pass
+    cells = len(EARNED_STEPS) * len(UNEARNED_STEPS)
+    if not skipped:
+        telemetry.record_cells(cells)
+        return benefits, {}, count, errors
+
+    rng = random.Random(f"{state_code}:{county}:{num_adults}:{num_children}:{enrolled}:{child_ages}")
+    sample = rng.sample(skipped, _verify_sample_size(len(skipped)))
+    try:
+        amounts = _calculate_tanf_amounts(state_code, YEAR, [
+            {
+                "num_adults": num_adults,
+                "num_children": num_children,
+                "earned_income": EARNED_STEPS[i] * 12,
+                "unearned_income": UNEARNED_STEPS[j] * 12,
+                "child_ages": child_ages,
+                "county": county,
+                "is_tanf_enrolled": enrolled,
+            }
+            for i, j in sample
+        ])
+        problem = "skipped cell has a benefit"
+        violated = any(round(amount / 12) != 0 for amount in amounts)
+    except Exception as e:
+        # Can't verify the skipped cells, so don't trust them
+        problem = f"verification failed ({type(e).__name__})"
+        violated = True
+    count += len(sample)
+    if violated:
+        print(
+            f"  warning: {state_code} {num_adults}_{num_children}: {problem}, "
+            f"recomputing without --monotone",
+            file=sys.stderr,
+        )
+        benefits, _, full_count, errors, _ = compute_grid(
+            state_code, county, num_adults, num_children, enrolled,
+            child_ages=child_ages, overrides=overrides,
+            single_month=single_month, report_cells=False,
+        )
+        count += full_count
+    telemetry.record_cells(cells)
+    return benefits, {}, count, errors
 
 
 def compute_state(args):
     """Compute all household configs for one effective state."""
-    state_code, county, output_name = args
+    state_code, county, output_name, options = args
+    telemetry.start_task(output_name)
+    tensor = None
+    if options.get("tensor"):
+        segment, tensor = _attach_tensor(options["tensor"])
+        tensor = tensor[options["tensor"]["files"].index(output_name)]
+    data = {}
+    cliff_maps = {}
+    curves = {}
+    program_data = {}
+    programs = options.get("programs") or []
+    count = 0
+    errors = 0
+
+    # Extra grids only for age bands that differ from the default child age
+    age_bands = None
+    if options.get("age_bands"):
+        try:
+            age_bands = probe_age_bands(state_code, county)
+        except Exception as e:
+            print(
+                f"  warning: {output_name}: age-band probe failed ({type(e).__name__}), "
+                f"skipping age bands",
+                file=sys.stderr,
+            )
+    extra_bands = [
+        band for band in age_bands or [] if band["age"] != DEFAULT_CHILD_AGE
+    ]
+
+    # Skipping $0-dominated cells needs the benefit to never rise with income
+    if options.get("monotone") and state_code not in NON_MONOTONE_STATES:
+        try:
+            monotone = probe_monotone(state_code, county)
+            reason = "benefit rises with income in the probe"
+        except Exception as e:
+            monotone = False
+            reason = f"monotonicity probe failed ({type(e).__name__})"
+        if not monotone:
+            print(f"  warning: {output_name}: {reason}, simulating every cell", file=sys.stderr)
+            options = {**options, "monotone": False}
+
+    for a, num_adults in enumerate(ADULTS_RANGE):
+        for c, num_children in enumerate(CHILDREN_RANGE):
+            for e, enrolled in enumerate(ENROLLED_VALUES):
+                key = f"{num_adults}_{num_children}_{str(enrolled).lower()}"
+                benefits, channels, grid_count, grid_errors = compute_config_grid(
+                    options, state_code, county, num_adults, num_children, enrolled,
+                    programs=programs,
+                )
+                count += grid_count
+                errors += grid_errors
+                if tensor is None:
+                    data[key] = benefits
+                else:
+                    tensor[a, c, e] = benefits
+                if channels:
+                    program_data[key] = channels
+
+                if options.get("curves"):
+                    config_curves, curve_count = compute_axis_curves(
+                        options, state_code, county, num_adults, num_children, enrolled,
+                    )
+                    count += curve_count
+                    if config_curves is None:
+                        errors += 1
+                    else:
+                        curves[key] = config_curves
+
+                if options.get("cliffs"):
+                    cliff_maps[key] = compute_cliff_map(
+                        state_code, county, num_adults, num_children,
+                        enrolled, benefits,
+                    )
+
+                # Child ages don't matter without children
+                for band in extra_bands if num_children else []:
+                    benefits, _, grid_count, grid_errors = compute_config_grid(
+                        options, state_code, county, num_adults, num_children,
+                        enrolled, child_ages=[band["age"]] * num_children,
+                    )
+                    count += grid_count
+                    errors += grid_errors
+                    data[f"{key}_age{band['min_age']}"] = benefits
+
+    # Write output (with a tensor, the parent writes the state file from it
+    # plus the age-band grids returned here)
+    if tensor is None:
+        output_path = os.path.join(OUTPUT_DIR, f"{output_name}.json")
+        with open(output_path, "w") as f:
+            json.dump(data, f, separators=(",", ":"))
+    else:
+        del tensor
+        segment.close()
+
+    if cliff_maps:
+        cliffs_path = os.path.join(OUTPUT_DIR, f"{output_name}.cliffs.json")
+        with open(cliffs_path, "w") as f:
+            json.dump(cliff_maps, f, separators=(",", ":"))
+
+    if curves:
+        curves_path = os.path.join(OUTPUT_DIR, f"{output_name}.curves.json")
+        with open(curves_path, "w") as f:
+            json.dump(curves, f, separators=(",", ":"))
+
+    if options.get("shards") and not options.get("tensor"):
+        write_shards(output_name, data)
+
+    # Other programs live in a side file so the TANF file the frontend
+    # always loads doesn't grow
+    if program_data:
+        programs_path = os.path.join(OUTPUT_DIR, f"{output_name}.programs.json")
+        with open(programs_path, "w") as f:
+            json.dump(program_data, f, separators=(",", ":"))
+
+    telemetry.finish_task()
+    return output_name, count, errors, age_bands, data if options.get("tensor") else None
+
+
+# Element type of the national tensor: whole $/mo benefits
+TENSOR_DTYPE = "int32"
+
+
+def _tensor_shape(num_files):
+    """(state file, adults, children, enrolled, earned, unearned) tensor shape."""
+    return (
+        num_files, len(ADULTS_RANGE), len(CHILDREN_RANGE), len(ENROLLED_VALUES),
+        len(EARNED_STEPS), len(UNEARNED_STEPS),
+    )
+
+
+def _attach_tensor(spec):
+    """
+    Attach to the parent's shared-memory tensor.
+
+    Returns (segment, array); close the segment once the array is dropped.
+    Workers share the parent's resource tracker, so attaching doesn't make
+    a worker's exit unlink the segment.
+    """
+    import numpy as np
+    from multiprocessing import shared_memory
+
+    segment = shared_memory.SharedMemory(name=spec["name"])
+    return segment, np.ndarray(spec["shape"], dtype=TENSOR_DTYPE, buffer=segment.buf)
+
+
+def write_tensor_outputs(tensor, files, extra, shards=False):
+    """
+    Write every state file (and shards) from the national tensor.
+
+    `extra` maps a file name to the grids that aren't in the tensor (age
+    bands), appended after the tensor's config grids.
+    """
+    for index, name in enumerate(files):
+        data = {}
+        for a, num_adults in enumerate(ADULTS_RANGE):
+            for c, num_children in enumerate(CHILDREN_RANGE):
+                for e, enrolled in enumerate(ENROLLED_VALUES):
+                    key = f"{num_adults}_{num_children}_{str(enrolled).lower()}"
+                    data[key] = tensor[index, a, c, e].tolist()
+        data.update(extra.get(name) or {})
+        with open(os.path.join(OUTPUT_DIR, f"{name}.json"), "w") as f:
+            json.dump(data, f, separators=(",", ":"))
+        if shards:
+            write_shards(name, data)
+
+
+def save_tensor(tensor, files):
+    """
+    Save the national tensor for analysts.
+
+    benefits.npy can be opened with np.load(..., mmap_mode="r"); benefits.npz
+    holds the same array with the labels of each axis. Returns the .npy path.
+    """
+    import numpy as np
+
+    os.makedirs(TENSOR_DIR, exist_ok=True)
+    npy_path = os.path.join(TENSOR_DIR, "benefits.npy")
+    np.save(npy_path, tensor)
+    np.savez_compressed(
+        os.path.join(TENSOR_DIR, "benefits.npz"),
+        benefits=tensor,
+        files=np.array(files),
+        adults=np.array(ADULTS_RANGE),
+        children=np.array(CHILDREN_RANGE),
+        enrolled=np.array(ENROLLED_VALUES),
+        earned_steps=np.array(EARNED_STEPS),
+        unearned_steps=np.array(UNEARNED_STEPS),
+        year=np.array(YEAR),
+    )
+    return npy_path
+
+
+# Lattice spacings ($/mo) of the progressive levels, coarsest first; each
+# must be a multiple of the grid step and the last one is the full grid
+PROGRESSIVE_STEPS = [400, 200, 100]
+
+
+def _write_json_atomic(path, data):
+    """Write JSON to a temp file and rename it, so readers never see a partial file."""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+    with os.fdopen(fd, "w") as f:
+        json.dump(data, f, separators=(",", ":"))
+    os.replace(tmp_path, path)
+
+
+def _lattice(size, stride):
+    """Grid indices every `stride` steps, always including both ends."""
+    return sorted(set(range(0, size, stride)) | {size - 1})
+
+
+def _fill_grid(cells):
+    """
+    Complete a grid computed on a lattice by bilinear interpolation.
+
+    `cells` has None for cells not computed yet. The computed cells form a
+    full lattice (every computed row has the same computed columns), so
+    interpolating along unearned income and then earned is bilinear.
+    """
+    import numpy as np
+
+    grid = np.array([[np.nan if v is None else v for v in row] for row in cells], dtype=float)
+    columns = np.arange(grid.shape[1])
+    for row in grid:
+        known = ~np.isnan(row)
+        if known.any():
+            row[:] = np.interp(columns, columns[known], row[known])
+    rows = np.arange(grid.shape[0])
+    for column in grid.T:
+        known = ~np.isnan(column)
+        column[:] = np.interp(rows, rows[known], column[known])
+    return np.floor(grid + 0.5).astype(int).tolist()
+
+
+def _record_simulations(seconds, households, error):
+    """Telemetry hook for _amounts_isolating_failures."""
+    if households > 1:
+        telemetry.record_batch(seconds, households, error)
+    else:
+        telemetry.record_simulation(seconds, error)
+
+
+def compute_state_level(args):
+    """
+    One level of a progressive precompute for one state file.
+
+    Simulates the cells of the level's lattice (every `step` $/mo on both
+    axes) that earlier levels didn't, one batched simulation per config,
+    then atomically rewrites the state file with the remaining cells
+    interpolated. `known` carries the exact cells computed so far as
+    {config key: rows with None for cells not computed}, and `hoisted` the
+    --hoist overrides of each config from the first level ({config key:
+    overrides}, None before the first level), so the hoist probe runs once
+    per config rather than once per level.
+
+    Returns:
+        (output name, updated known cells, simulations run, errors,
+         hoisted overrides)
+    """
+    state_code, county, output_name, options, step, known, hoisted = args
+    telemetry.start_task(output_name)
+    stride = step // (EARNED_STEPS[1] - EARNED_STEPS[0])
+    rows = _lattice(len(EARNED_STEPS), stride)
+    columns = _lattice(len(UNEARNED_STEPS), stride)
+    single_month = bool(options.get("single_month"))
+    known = dict(known or {})
+    hoisted = dict(hoisted or {})
     data = {}
     count = 0
     errors = 0
@@ -58,46 +798,379 @@ def compute_state(args):
         for num_children in CHILDREN_RANGE:
             for enrolled in ENROLLED_VALUES:
                 key = f"{num_adults}_{num_children}_{str(enrolled).lower()}"
-                benefits = []
-
-                for earned_monthly in EARNED_STEPS:
-                    earned_annual = earned_monthly * 12
-                    row = []
-
-                    for unearned_monthly in UNEARNED_STEPS:
-                        unearned_annual = unearned_monthly * 12
-                        try:
-                            amount, _ = _calculate_tanf_amount(
-                                state=state_code,
-                                year=YEAR,
-                                num_adults=num_adults,
-                                num_children=num_children,
-                                earned_income=earned_annual,
-                                unearned_income=unearned_annual,
-                                county=county,
-                                is_tanf_enrolled=enrolled,
-                            )
-                            row.append(round(amount / 12))
-                        except Exception as e:
-                            row.append(0)
-                            errors += 1
-
-                        count += 1
-
-                    benefits.append(row)
-
-                data[key] = benefits
-
-    # Write output
-    output_path = os.path.join(OUTPUT_DIR, f"{output_name}.json")
-    with open(output_path, "w") as f:
-        json.dump(data, f, separators=(",", ":"))
+                cells = [list(row) for row in known.get(key) or [
+                    [None] * len(UNEARNED_STEPS) for _ in EARNED_STEPS
+                ]]
+                todo = [(i, j) for i in rows for j in columns if cells[i][j] is None]
+                if key not in hoisted:
+                    hoisted[key] = _hoisted_overrides(
+                        options, state_code, county, num_adults, num_children, enrolled
+                    )
+                overrides = hoisted[key]
+                if options.get("prune"):
+                    overrides = pruned_overrides(state_code, YEAR, county, overrides)
+                households = [
+                    {
+                        "num_adults": num_adults,
+                        "num_children": num_children,
+                        "earned_income": EARNED_STEPS[i] * 12,
+                        "unearned_income": UNEARNED_STEPS[j] * 12,
+                        "county": county,
+                        "is_tanf_enrolled": enrolled,
+                        "overrides": overrides,
+                    }
+                    for i, j in todo
+                ]
+                amounts, simulations = _amounts_isolating_failures(
+                    state_code, YEAR, households, record=_record_simulations,
+                    single_month=single_month,
+                )
+                count += simulations
+                errors += amounts.count(None)
+                for (i, j), amount in zip(todo, amounts):
+                    cells[i][j] = round((amount or 0) / 12)
+                telemetry.record_cells(len(todo))
+                known[key] = cells
+                data[key] = _fill_grid(cells)
+
+    _write_json_atomic(os.path.join(OUTPUT_DIR, f"{output_name}.json"), data)
+    if options.get("shards"):
+        write_shards(output_name, data)
+    telemetry.finish_task()
+    return output_name, known, count, errors, hoisted
+
+
+def _dedup_years(grids_by_year, years):
+    """
+    Replace grids that repeat across years with the year that holds them.
+
+    `grids_by_year` is {year: {config key: grid}}. The first year in `years`
+    keeps every grid; a later year's grid equal to a kept grid of an earlier
+    year becomes that year's number. Returns (the same shape, grids replaced).
+    """
+    output = {}
+    replaced = 0
+    for index, year in enumerate(years):
+        output[year] = {}
+        for key, grid in grids_by_year[year].items():
+            same = next(
+                (earlier for earlier in years[:index]
+                 if output[earlier][key] == grid),
+                None,
+            )
+            if same is not None:
+                replaced += 1
+            output[year][key] = grid if same is None else same
+    return output, replaced
+
+
+def _detach_year_references(output_name, years):
+    """
+    Inline the grids other years' files take from `years` by reference.
+
+    Called before a run rewrites years/<year>/<name>.json for `years`: a
+    file from an earlier run that refers to one of them would otherwise
+    silently pick up grids from a different policyengine-us version.
+    """
+    root = os.path.join(OUTPUT_DIR, "years")
+    if not os.path.isdir(root):
+        return
+    loaded = {}
+
+    def load(year):
+        if year not in loaded:
+            with open(os.path.join(root, str(year), f"{output_name}.json")) as f:
+                loaded[year] = json.load(f)
+        return loaded[year]
+
+    def resolve(year, key):
+        grid = load(year)[key]
+        return resolve(grid, key) if isinstance(grid, int) else grid
 
-    return output_name, count, errors
+    for entry in sorted(os.listdir(root)):
+        path = os.path.join(root, entry, f"{output_name}.json")
+        if not entry.isdigit() or int(entry) in years or not os.path.exists(path):
+            continue
+        data = load(int(entry))
+        refs = [key for key, grid in data.items() if isinstance(grid, int) and grid in years]
+        if not refs:
+            continue
+        data = {**data, **{key: resolve(data[key], key) for key in refs}}
+        _write_json_atomic(path, data)
+        loaded[int(entry)] = data
+
+
+def compute_state_years(args):
+    """
+    All config grids of one state file for several years.
+
+    Each config is one batched simulation holding every cell for every year
+    (calculator._calculate_tanf_amounts_by_year), so the households are
+    built once and shared across periods. Every year goes to
+    years/<year>/<name>.json, where a grid identical to an earlier year's
+    of this run (YEAR first) is stored as that year's number. Files of
+    other years that refer to a year this run rewrites get those grids
+    inlined first (_detach_year_references). YEAR's grids also go to
+    <name>.json as usual.
+
+    Returns:
+        (output name, simulations run, errors, grids deduplicated)
+    """
+    state_code, county, output_name, options, years = args
+    telemetry.start_task(output_name)
+    # YEAR first, so its complete file is what other years refer to
+    years = sorted(years, key=lambda year: (year != YEAR, year))
+    single_month = bool(options.get("single_month"))
+    prune = bool(options.get("prune"))
+    grids_by_year = {year: {} for year in years}
+    count = 0
+    errors = 0
+    width = len(UNEARNED_STEPS)
+
+    for num_adults in ADULTS_RANGE:
+        for num_children in CHILDREN_RANGE:
+            for enrolled in ENROLLED_VALUES:
+                key = f"{num_adults}_{num_children}_{str(enrolled).lower()}"
+                households = [
+                    {
+                        "num_adults": num_adults,
+                        "num_children": num_children,
+                        "earned_income": earned * 12,
+                        "unearned_income": unearned * 12,
+                        "county": county,
+                        "is_tanf_enrolled": enrolled,
+                    }
+                    for earned in EARNED_STEPS
+                    for unearned in UNEARNED_STEPS
+                ]
+                started = time.monotonic()
+                try:
+                    amounts = _calculate_tanf_amounts_by_year(
+                        state_code, years, households,
+                        prune=prune, single_month=single_month,
+                    )
+                    telemetry.record_batch(time.monotonic() - started, len(households))
+                    count += 1
+                except Exception as e:
+                    telemetry.record_batch(
+                        time.monotonic() - started, len(households), type(e).__name__
+                    )
+                    # Fall back to one simulation per year, isolating failing cells
+                    amounts = {}
+                    for year in years:
+                        amounts[year], simulations = _amounts_isolating_failures(
+                            state_code, year, households, record=_record_simulations,
+                            prune=prune, single_month=single_month,
+                        )
+                        count += simulations
+                        errors += amounts[year].count(None)
+                for year in years:
+                    grids_by_year[year][key] = [
+                        [round((amount or 0) / 12) for amount in amounts[year][i * width:(i + 1) * width]]
+                        for i in range(len(EARNED_STEPS))
+                    ]
+                telemetry.record_cells(len(households) * len(years))
+
+    output, replaced = _dedup_years(grids_by_year, years)
+    _detach_year_references(output_name, years)
+    for year in years:
+        year_dir = os.path.join(OUTPUT_DIR, "years", str(year))
+        os.makedirs(year_dir, exist_ok=True)
+        with open(os.path.join(year_dir, f"{output_name}.json"), "w") as f:
+            json.dump(output[year], f, separators=(",", ":"))
+    if YEAR in years:
+        with open(os.path.join(OUTPUT_DIR, f"{output_name}.json"), "w") as f:
+            json.dump(grids_by_year[YEAR], f, separators=(",", ":"))
+    telemetry.finish_task()
+    return output_name, count, errors, replaced
 
 
-def build_metadata():
-    """Build the metadata.json file with states, counties, FPG, and grid config."""
+# Incomes ($/mo, earned x unearned) traced to find the parameters a config reads
+REFORM_TRACE_INCOMES = [(0, 0), (1000, 0), (0, 1000), (2500, 2500)]
+
+
+def _state_untouched(state_code, changed):
+    """Whether every changed parameter lives under another state's tree."""
+    prefix = f"gov.states.{state_code.lower()}."
+    return all(
+        path.startswith("gov.states.") and not path.startswith(prefix)
+        for path in changed
+    )
+
+
+def _parse_config_key(key, bands):
+    """(adults, children, enrolled, child_ages) for a grid key like 1_2_false_age6."""
+    num_adults, num_children, enrolled, *band = key.split("_")
+    child_ages = None
+    if band:
+        min_age = int(band[0][len("age"):])
+        age = next(b["age"] for b in bands if b["min_age"] == min_age)
+        child_ages = [age] * int(num_children)
+    return int(num_adults), int(num_children), enrolled == "true", child_ages
+
+
+def compute_reform_state(args):
+    """
+    Baseline, reform and delta grids for one state file under a parameter reform.
+
+    Grids the reform can't affect are copied from the baseline data in
+    OUTPUT_DIR. A state is skipped outright when every changed parameter is
+    under another state's gov.states tree; otherwise each config is traced
+    (calculator.trace_tanf_dependencies) and only configs that read a changed
+    parameter are recomputed, all cells of a config in one batched simulation.
+    If that simulation fails, the config's cells are simulated one at a
+    time and failing cells count as errors with a $0 benefit.
+
+    Returns:
+        (output name, simulations run, recomputed config keys, errors)
+    """
+    state_code, county, output_name, reform, reform_dir = args
+    try:
+        with open(os.path.join(OUTPUT_DIR, f"{output_name}.json")) as f:
+            baseline = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"  warning: {output_name}: no baseline grids ({type(e).__name__})", file=sys.stderr)
+        return output_name, 0, [], 1
+    with open(os.path.join(OUTPUT_DIR, "metadata.json")) as f:
+        bands = json.load(f).get("age_bands", {}).get(output_name, [])
+
+    changed = sorted(reform)
+    data = dict(baseline)
+    recomputed = []
+    count = 0
+    errors = 0
+    if not _state_untouched(state_code, changed):
+        for key in baseline:
+            num_adults, num_children, enrolled, child_ages = _parse_config_key(key, bands)
+            household = {
+                "num_adults": num_adults,
+                "num_children": num_children,
+                "child_ages": child_ages,
+                "county": county,
+                "is_tanf_enrolled": enrolled,
+            }
+            try:
+                _, parameters = trace_tanf_dependencies(state_code, YEAR, [
+                    {**household, "earned_income": earned * 12, "unearned_income": unearned * 12}
+                    for earned, unearned in REFORM_TRACE_INCOMES
+                ])
+                affected = parameters_affected(parameters, changed)
+            except Exception:
+                # Can't tell what the config reads, so recompute it
+                affected = True
+            count += 1
+            if not affected:
+                continue
+            cells = [
+                {**household, "earned_income": earned * 12, "unearned_income": unearned * 12}
+                for earned in EARNED_STEPS
+                for unearned in UNEARNED_STEPS
+            ]
+            amounts, simulations = _amounts_isolating_failures(
+                state_code, YEAR, cells, reform=reform
+            )
+            count += simulations
+            errors += amounts.count(None)
+            width = len(UNEARNED_STEPS)
+            data[key] = [
+                [round((amount or 0) / 12) for amount in amounts[i * width:(i + 1) * width]]
+                for i in range(len(EARNED_STEPS))
+            ]
+            recomputed.append(key)
+
+    delta = {
+        key: [
+            [new - old for new, old in zip(new_row, old_row)]
+            for new_row, old_row in zip(data[key], baseline[key])
+        ]
+        for key in baseline
+    }
+    for suffix, output in (("baseline", baseline), ("reform", data), ("delta", delta)):
+        with open(os.path.join(reform_dir, f"{output_name}.{suffix}.json"), "w") as f:
+            json.dump(output, f, separators=(",", ":"))
+    return output_name, count, recomputed, errors
+
+
+def write_shards(output_name, data):
+    """
+    Write each config grid of a state file to its own shard.
+
+    Shards go to shards/<name>/<config key>.json next to the whole file, with
+    shards/<name>/max.json mapping each config key to its $0-income benefit,
+    so the frontend can fetch just the household it shows.
+    """
+    shard_dir = os.path.join(OUTPUT_DIR, "shards", output_name)
+    os.makedirs(shard_dir, exist_ok=True)
+    for key, grid in data.items():
+        with open(os.path.join(shard_dir, f"{key}.json"), "w") as f:
+            json.dump(grid, f, separators=(",", ":"))
+    with open(os.path.join(shard_dir, "max.json"), "w") as f:
+        json.dump({key: grid[0][0] for key, grid in data.items()}, f, separators=(",", ":"))
+
+
+# Upper bound ($/mo) for the eligibility-limit search, above the grid's
+# $3,000 so large households in generous states still get an exact limit
+LIMIT_INCOME_MAX = 10000
+
+
+def compute_eligibility_limits(args):
+    """
+    Exact earned-only and unearned-only eligibility limits for one state file.
+
+    All configs' searches for the file run together (see
+    calculator.find_breakeven_incomes). Limits are the lowest monthly
+    income with no benefit, or None if the config is never eligible or the
+    search failed (logged).
+    """
+    state_code, county, output_name, options = args
+    keys = []
+    searches = []
+    for num_adults in ADULTS_RANGE:
+        for num_children in CHILDREN_RANGE:
+            for enrolled in ENROLLED_VALUES:
+                key = f"{num_adults}_{num_children}_{str(enrolled).lower()}"
+                household = {
+                    "num_adults": num_adults,
+                    "num_children": num_children,
+                    "earned_income": 0,
+                    "unearned_income": 0,
+                    "county": county,
+                    "is_tanf_enrolled": enrolled,
+                }
+                for income_type in ("earned", "unearned"):
+                    keys.append((key, income_type))
+                    searches.append({"household": household, "income_type": income_type})
+
+    try:
+        annual_limits = find_breakeven_incomes(
+            state_code, YEAR, searches, income_max=LIMIT_INCOME_MAX * 12
+        )
+    except Exception as e:
+        print(
+            f"  warning: {output_name}: eligibility-limit search failed ({type(e).__name__})",
+            file=sys.stderr,
+        )
+        annual_limits = [None] * len(searches)
+    limits = {}
+    for (key, income_type), annual in zip(keys, annual_limits):
+        limits.setdefault(key, {})[income_type] = (
+            round(annual / 12) if annual is not None else None
+        )
+    return output_name, limits
+
+
+def build_metadata(eligibility_limits=None, age_bands=None, shard_files=None, resolution=None,
+                   years=None, curve_files=None, program_files=None, cliff_files=None,
+                   rewritten=None):
+    """
+    Build the metadata.json file with states, counties, FPG, and grid config.
+
+    `rewritten` lists the state files whose <name>.json this run wrote;
+    their shards from earlier runs are stale, so they stay listed only if
+    this run wrote them again (`shard_files`). The same goes for their
+    axis curves (`curve_files`), program channels (`program_files`), cliff
+    maps (`cliff_files`) and age bands (`age_bands`).
+    """
     # Build county lists with region/group mappings
     def build_county_list(counties):
         county_list = []
@@ -113,16 +1186,37 @@ def build_metadata():
     pa_counties, pa_county_groups = build_county_list(PA_COUNTIES)
     va_counties, va_county_groups = build_county_list(VA_COUNTIES)
 
-    # Federal Poverty Guidelines 2025
-    fpg = {
-        "default": {"base": 15650, "per_additional": 5500},
-        "AK": {"base": 19560, "per_additional": 6880},
-        "HI": {"base": 18000, "per_additional": 6330},
-    }
-
     from importlib.metadata import version as pkg_version
     policyengine_version = pkg_version("policyengine-us")
 
+    # Keep per-state-file sections for files not recomputed in this run
+    output_path = os.path.join(OUTPUT_DIR, "metadata.json")
+    previous = {}
+    if os.path.exists(output_path):
+        with open(output_path) as f:
+            previous = json.load(f)
+    limits = {**previous.get("eligibility_limits", {}), **(eligibility_limits or {})}
+    stale = set(rewritten or [])
+    bands = {
+        name: file_bands for name, file_bands in previous.get("age_bands", {}).items()
+        if name not in stale
+    }
+    bands.update(age_bands or {})
+    shards = sorted(
+        (set(previous.get("shard_files", [])) - stale) | set(shard_files or [])
+    )
+    curves = sorted(
+        (set(previous.get("curve_files", [])) - stale) | set(curve_files or [])
+    )
+    programs = sorted(
+        (set(previous.get("program_files", [])) - stale) | set(program_files or [])
+    )
+    cliffs = sorted(
+        (set(previous.get("cliff_files", [])) - stale) | set(cliff_files or [])
+    )
+    resolutions = {**previous.get("resolution", {}), **(resolution or {})}
+    all_years = sorted(set(previous.get("years", [])) | set(years or []))
+
     metadata = {
         "policyengine_us_version": policyengine_version,
         "year": YEAR,
@@ -130,6 +1224,7 @@ def build_metadata():
         "unearned_steps": UNEARNED_STEPS,
         "adults_range": ADULTS_RANGE,
         "children_range": list(CHILDREN_RANGE),
+        "enrolled_values": ENROLLED_VALUES,
         "states": [
             {
                 "code": code,
@@ -143,16 +1238,102 @@ def build_metadata():
             "PA": {"counties": pa_counties, "county_groups": pa_county_groups},
             "VA": {"counties": va_counties, "county_groups": va_county_groups},
         },
-        "fpg": fpg,
+        "fpg": fpg_table(YEAR),
     }
+    if limits:
+        metadata["eligibility_limits"] = dict(sorted(limits.items()))
+    if bands:
+        metadata["age_bands"] = dict(sorted(bands.items()))
+    if shards:
+        metadata["shard_files"] = shards
+    # State files with exact axis curves (<name>.curves.json)
+    if curves:
+        metadata["curve_files"] = curves
+        metadata["curve_step"] = CURVE_STEP
+    # State files with other program channels (<name>.programs.json)
+    if programs:
+        metadata["program_files"] = programs
+    # State files with marginal rates and cliffs (<name>.cliffs.json)
+    if cliffs:
+        metadata["cliff_files"] = cliffs
+    # Lattice spacing ($/mo) each state file was simulated at; cells in
+    # between are interpolated until a progressive run reaches the grid step
+    if resolutions:
+        metadata["resolution"] = dict(sorted(resolutions.items()))
+    # Years precomputed with --years, under years/<year>/ (see
+    # compute_state_years)
+    if all_years:
+        metadata["years"] = all_years
+        metadata["fpg_by_year"] = {str(year): fpg_table(year) for year in all_years}
 
-    output_path = os.path.join(OUTPUT_DIR, "metadata.json")
-    with open(output_path, "w") as f:
-        json.dump(metadata, f, separators=(",", ":"))
+    _write_json_atomic(output_path, metadata)
 
     return output_path
 
 
+# Published Federal Poverty Guidelines; other years come from policyengine-us
+FPG_TABLES = {
+    2024: {
+        "default": {"base": 15060, "per_additional": 5380},
+        "AK": {"base": 18810, "per_additional": 6730},
+        "HI": {"base": 17310, "per_additional": 6190},
+    },
+    2025: {
+        "default": {"base": 15650, "per_additional": 5500},
+        "AK": {"base": 19560, "per_additional": 6880},
+        "HI": {"base": 18000, "per_additional": 6330},
+    },
+}
+
+
+def fpg_table(year):
+    """Federal Poverty Guidelines for a year, in the metadata "fpg" format."""
+    if year in FPG_TABLES:
+        return FPG_TABLES[year]
+    from policyengine_us.system import system
+
+    fpg = system.parameters.gov.hhs.fpg
+    instant = f"{year}-01-01"
+    return {
+        name: {
+            "base": round(float(fpg.first_person[region](instant))),
+            "per_additional": round(float(fpg.additional_person[region](instant))),
+        }
+        for name, region in (("default", "CONTIGUOUS_US"), ("AK", "AK"), ("HI", "HI"))
+    }
+
+
+def state_files(state_filter=None):
+    """(state code, representative county, output name) for each state file."""
+    files = []
+    for state_code in sorted(PILOT_STATES.keys()):
+        if state_filter and state_code not in state_filter:
+            continue
+        if state_code == "CA":
+            for region, county in CA_REGION_COUNTIES.items():
+                files.append((state_code, county, f"CA_{region}"))
+        elif state_code == "PA":
+            for group, county in PA_GROUP_COUNTIES.items():
+                files.append((state_code, county, f"PA_{group}"))
+        elif state_code == "VA":
+            for group, county in VA_GROUP_COUNTIES.items():
+                files.append((state_code, county, f"VA_{group}"))
+        else:
+            files.append((state_code, None, state_code))
+    return files
+
+
+def start_collector(context, args, total_cells):
+    """(queue, Collector) for the pool's workers, or (None, None) without --metrics-*."""
+    if not (args.metrics_jsonl or args.metrics_prom):
+        return None, None
+    queue = context.Queue()
+    collector = telemetry.Collector(
+        queue, total_cells, jsonl_path=args.metrics_jsonl, prom_path=args.metrics_prom,
+    ).start()
+    return queue, collector
+
+
 def main():
     import argparse
 
@@ -161,11 +1342,100 @@ def main():
         "--states",
         help="Comma-separated state codes to process (e.g., AK,AL,AR). Default: all states.",
     )
+    parser.add_argument(
+        "--files",
+        help="Comma-separated state files to process (e.g., CA_1,PA_3,NY), "
+             "as printed by diff_versions.py",
+    )
     parser.add_argument(
         "--metadata-only",
         action="store_true",
         help="Only generate metadata.json",
     )
+    parser.add_argument(
+        "--cliffs",
+        action="store_true",
+        help="Also write marginal-rate and cliff maps (<state>.cliffs.json)",
+    )
+    parser.add_argument(
+        "--age-bands",
+        action="store_true",
+        help="Probe child-age breakpoints and add grids for each extra age band",
+    )
+    parser.add_argument(
+        "--hoist",
+        action="store_true",
+        help="Compute income-invariant variables once per config and inject them",
+    )
+    parser.add_argument(
+        "--prune",
+        action="store_true",
+        help="TANF-only simulations: replace variables the state's TANF result doesn't use",
+    )
+    parser.add_argument(
+        "--single-month",
+        action="store_true",
+        help="Evaluate TANF for one month and scale it in states where that matches the full year",
+    )
+    parser.add_argument(
+        "--monotone",
+        action="store_true",
+        help="Skip cells dominated by a $0 cell and demographically ineligible configs",
+    )
+    parser.add_argument(
+        "--programs",
+        help="Comma-separated extra programs to store per grid (snap,eitc,ctc)",
+    )
+    parser.add_argument(
+        "--curves",
+        action="store_true",
+        help=f"Also write exact earned-only and unearned-only benefit curves every "
+             f"${CURVE_STEP}/mo (<state>.curves.json)",
+    )
+    parser.add_argument(
+        "--shards",
+        action="store_true",
+        help="Also write one file per config grid plus a max-benefit summary (shards/<state>/)",
+    )
+    parser.add_argument(
+        "--tensor",
+        action="store_true",
+        help="Assemble all grids in one shared-memory tensor, write every output from it "
+             "and save it as tensor/benefits.npy and .npz",
+    )
+    parser.add_argument(
+        "--metrics-jsonl",
+        help="Stream per-worker telemetry events (latency, cells, errors, RSS, ETA) as JSON lines",
+    )
+    parser.add_argument(
+        "--metrics-prom",
+        help="Keep a Prometheus textfile with run metrics up to date at this path",
+    )
+    parser.add_argument(
+        "--progressive",
+        action="store_true",
+        help=f"Write all state files at ${PROGRESSIVE_STEPS[0]}/mo resolution first, "
+             f"then refine down to ${PROGRESSIVE_STEPS[-1]}/mo",
+    )
+    parser.add_argument(
+        "--years",
+        help=f"Comma-separated years to compute in one pass per config (e.g. 2024,2025,2026) "
+             f"into years/<year>/; {YEAR} also goes to the usual files",
+    )
+    parser.add_argument(
+        "--reform",
+        help="JSON file of parameter changes ({path: value}); writes baseline, "
+             "reform and delta grids under reforms/, recomputing only affected configs",
+    )
+    parser.add_argument(
+        "--reform-name",
+        help="Output directory name under reforms/ (default: reform file name)",
+    )
+    parser.add_argument(
+        "--eligibility-limits",
+        action="store_true",
+        help="Only compute exact earned/unearned eligibility limits into metadata.json",
+    )
     args = parser.parse_args()
 
     os.makedirs(OUTPUT_DIR, exist_ok=True)
@@ -180,23 +1450,35 @@ def main():
         state_filter = set(args.states.upper().split(","))
     else:
         state_filter = None
+    file_filter = set(args.files.upper().split(",")) if args.files else None
 
-    # Build task list
-    tasks = []
-    for state_code in sorted(PILOT_STATES.keys()):
-        if state_filter and state_code not in state_filter:
-            continue
-        if state_code == "CA":
-            for region, county in CA_REGION_COUNTIES.items():
-                tasks.append((state_code, county, f"CA_{region}"))
-        elif state_code == "PA":
-            for group, county in PA_GROUP_COUNTIES.items():
-                tasks.append((state_code, county, f"PA_{group}"))
-        elif state_code == "VA":
-            for group, county in VA_GROUP_COUNTIES.items():
-                tasks.append((state_code, county, f"VA_{group}"))
-        else:
-            tasks.append((state_code, None, state_code))
+    options = {
+        "cliffs": args.cliffs,
+        "age_bands": args.age_bands,
+        "hoist": args.hoist,
+        "prune": args.prune,
+        "single_month": args.single_month,
+        "monotone": args.monotone,
+        "shards": args.shards,
+        "curves": args.curves,
+        "programs": [
+            program for program in (args.programs or "").lower().split(",")
+            if program and program != "tanf"
+        ],
+    }
+    unknown = set(options["programs"]) - set(PROGRAMS)
+    if unknown:
+        parser.error(f"unknown programs: {', '.join(sorted(unknown))}")
+    if (args.metrics_jsonl or args.metrics_prom) and (args.reform or args.eligibility_limits):
+        parser.error(
+            "--metrics-jsonl and --metrics-prom can't be combined with --reform or --eligibility-limits"
+        )
+
+    tasks = [
+        (state_code, county, name, options)
+        for state_code, county, name in state_files(state_filter)
+        if not file_filter or name in file_filter
+    ]
 
     sims_per_state = (
         len(EARNED_STEPS)
@@ -205,6 +1487,144 @@ def main():
         * len(CHILDREN_RANGE)
         * len(ENROLLED_VALUES)
     )
+
+    if args.reform:
+        with open(args.reform) as f:
+            reform = json.load(f)
+        reform_name = args.reform_name or os.path.splitext(os.path.basename(args.reform))[0]
+        reform_dir = os.path.join(REFORM_DIR, reform_name)
+        os.makedirs(reform_dir, exist_ok=True)
+        build_capability_registry(YEAR, sorted({task[0] for task in tasks}))
+        print(f"Evaluating reform {reform_name} ({len(reform)} parameters) for {len(tasks)} state files...")
+        start = time.time()
+        recomputed = {}
+        reform_errors = {}
+        reform_tasks = [(code, county, name, reform, reform_dir) for code, county, name, _ in tasks]
+        with warm_process_context().Pool(min(cpu_count(), len(reform_tasks))) as pool:
+            for name, count, keys, errors in pool.imap_unordered(compute_reform_state, reform_tasks):
+                recomputed[name] = keys
+                if errors:
+                    reform_errors[name] = errors
+                print(f"  {name}: {len(keys)} configs recomputed, {count} simulations, {errors} errors")
+        from importlib.metadata import version as pkg_version
+        manifest = {
+            "reform": reform,
+            "policyengine_us_version": pkg_version("policyengine-us"),
+            "year": YEAR,
+            "recomputed": dict(sorted(recomputed.items())),
+            "errors": dict(sorted(reform_errors.items())),
+        }
+        with open(os.path.join(reform_dir, "manifest.json"), "w") as f:
+            json.dump(manifest, f, indent=2)
+        print(f"Reform grids: {reform_dir} ({time.time() - start:.0f}s)")
+        return
+
+    if args.eligibility_limits:
+        build_capability_registry(YEAR, sorted({task[0] for task in tasks}))
+        print(f"Computing eligibility limits for {len(tasks)} state files...")
+        start = time.time()
+        eligibility_limits = {}
+        with warm_process_context().Pool(min(cpu_count(), len(tasks))) as pool:
+            for name, limits in pool.imap_unordered(compute_eligibility_limits, tasks):
+                eligibility_limits[name] = limits
+                print(f"  {name}: {len(limits)} configs")
+        meta_path = build_metadata(eligibility_limits)
+        print(f"Metadata: {meta_path} ({time.time() - start:.0f}s)")
+        return
+
+    if args.years:
+        years = sorted({int(year) for year in args.years.split(",") if year})
+        if (
+            args.age_bands or args.cliffs or args.monotone or args.hoist or args.progressive
+            or args.tensor or args.shards or args.curves or options["programs"]
+        ):
+            parser.error(
+                "--years can't be combined with --age-bands, --cliffs, --monotone, --hoist, "
+                "--progressive, --tensor, --shards, --curves or --programs"
+            )
+        states = sorted({task[0] for task in tasks})
+        for year in years:
+            build_capability_registry(year, states)
+        print(f"Precomputing {len(tasks)} state files for {', '.join(map(str, years))}...")
+        start = time.time()
+        total_errors = 0
+        year_tasks = [(*task, years) for task in tasks]
+        context = warm_process_context()
+        metrics_queue, collector = start_collector(
+            context, args, sims_per_state * len(tasks) * len(years)
+        )
+        with context.Pool(
+            min(cpu_count(), len(tasks)), initializer=telemetry.init_worker, initargs=(metrics_queue,)
+        ) as pool:
+            for name, count, errors, replaced in pool.imap_unordered(
+                compute_state_years, year_tasks
+            ):
+                total_errors += errors
+                print(
+                    f"  {name}: {count:,} simulations, {errors} errors, "
+                    f"{replaced} grids shared with another year"
+                )
+        if collector:
+            collector.stop()
+        resolution = None
+        if YEAR in years:
+            resolution = {task[2]: EARNED_STEPS[1] - EARNED_STEPS[0] for task in tasks}
+        meta_path = build_metadata(
+            resolution=resolution, years=years,
+            rewritten=[task[2] for task in tasks] if YEAR in years else None,
+        )
+        print(f"Metadata: {meta_path}")
+        print(f"\nTotal errors: {total_errors}")
+        print(f"Done in {time.time() - start:.0f}s")
+        return
+
+    if args.progressive:
+        if (
+            args.age_bands or args.cliffs or args.monotone or args.tensor or args.curves
+            or options["programs"]
+        ):
+            parser.error(
+                "--progressive can't be combined with --age-bands, --cliffs, --monotone, "
+                "--tensor, --curves or --programs"
+            )
+        build_capability_registry(YEAR, sorted({task[0] for task in tasks}))
+        print(f"Progressive precompute of {len(tasks)} state files, levels {PROGRESSIVE_STEPS} $/mo")
+        start = time.time()
+        known = {}
+        hoisted = {}
+        context = warm_process_context()
+        # Each level only simulates cells the coarser ones didn't, so the
+        # levels add up to one full grid per file
+        metrics_queue, collector = start_collector(context, args, sims_per_state * len(tasks))
+        with context.Pool(
+            min(cpu_count(), len(tasks)), initializer=telemetry.init_worker, initargs=(metrics_queue,)
+        ) as pool:
+            for step in PROGRESSIVE_STEPS:
+                level_tasks = [
+                    (*task, step, known.get(task[2]), hoisted.get(task[2])) for task in tasks
+                ]
+                count = 0
+                errors = 0
+                for name, cells, task_count, task_errors, task_hoisted in pool.imap_unordered(
+                    compute_state_level, level_tasks
+                ):
+                    known[name] = cells
+                    hoisted[name] = task_hoisted
+                    count += task_count
+                    errors += task_errors
+                build_metadata(
+                    shard_files=[task[2] for task in tasks] if args.shards else None,
+                    resolution={task[2]: step for task in tasks},
+                    rewritten=[task[2] for task in tasks],
+                )
+                print(
+                    f"  ${step}/mo: all {len(tasks)} files written "
+                    f"({count:,} simulations, {errors} errors, {time.time() - start:.0f}s elapsed)"
+                )
+        if collector:
+            collector.stop()
+        return
+
     total_sims = sims_per_state * len(tasks)
 
     from importlib.metadata import version as pkg_version
@@ -220,25 +1640,87 @@ def main():
 
     start = time.time()
 
+    # Probe which variables each state supports once, before starting workers, so
+    # workers read the registry from the disk cache instead of re-probing
+    build_capability_registry(YEAR, sorted({task[0] for task in tasks}))
+
     # Use multiprocessing
     num_workers = min(cpu_count(), len(tasks))
     print(f"Using {num_workers} workers...\n")
 
     completed = 0
     total_errors = 0
+    age_bands = {}
 
-    with Pool(num_workers) as pool:
-        for result in pool.imap_unordered(compute_state, tasks):
-            name, count, errors = result
-            completed += 1
-            total_errors += errors
-            elapsed = time.time() - start
-            rate = count / max(elapsed, 0.001)
-            print(
-                f"  [{completed}/{len(tasks)}] {name}: "
-                f"{count:,} sims, {errors} errors "
-                f"({elapsed:.0f}s elapsed, ~{rate:.0f} sims/s)"
-            )
+    # Workers stream telemetry to the parent only when metrics are requested
+    # Workers fork from a process that already loaded policyengine-us
+    context = warm_process_context()
+    metrics_queue, collector = start_collector(context, args, total_sims)
+
+    # Workers write their grids straight into one shared-memory tensor
+    segment = None
+    if args.tensor:
+        import numpy as np
+        from multiprocessing import shared_memory
+
+        files = [task[2] for task in tasks]
+        shape = _tensor_shape(len(files))
+        segment = shared_memory.SharedMemory(
+            create=True, size=int(np.prod(shape)) * np.dtype(TENSOR_DTYPE).itemsize
+        )
+        options["tensor"] = {"name": segment.name, "shape": shape, "files": files}
+    extra_grids = {}
+
+    try:
+        with context.Pool(
+            num_workers, initializer=telemetry.init_worker, initargs=(metrics_queue,)
+        ) as pool:
+            for result in pool.imap_unordered(compute_state, tasks):
+                name, count, errors, bands, extra = result
+                if bands is not None:
+                    age_bands[name] = bands
+                if extra:
+                    extra_grids[name] = extra
+                completed += 1
+                total_errors += errors
+                elapsed = time.time() - start
+                rate = count / max(elapsed, 0.001)
+                progress = ""
+                if collector:
+                    eta = collector.eta_seconds()
+                    progress = f", {collector.task_rate(name):.1f} cells/s"
+                    if eta is not None:
+                        progress += f", ETA {eta / 60:.1f}m"
+                print(
+                    f"  [{completed}/{len(tasks)}] {name}: "
+                    f"{count:,} sims, {errors} errors "
+                    f"({elapsed:.0f}s elapsed, ~{rate:.0f} sims/s{progress})"
+                )
+        if segment is not None:
+            tensor = np.ndarray(shape, dtype=TENSOR_DTYPE, buffer=segment.buf)
+            write_tensor_outputs(tensor, files, extra_grids, shards=args.shards)
+            print(f"Tensor: {save_tensor(tensor, files)} {shape}")
+            del tensor
+    finally:
+        if segment is not None:
+            segment.close()
+            segment.unlink()
+
+    if collector:
+        collector.stop()
+
+    shard_files = [task[2] for task in tasks] if args.shards else None
+    # Full-resolution files replace any coarser progressive ones
+    resolution = {task[2]: EARNED_STEPS[1] - EARNED_STEPS[0] for task in tasks}
+    curve_files = [task[2] for task in tasks] if args.curves else None
+    program_files = [task[2] for task in tasks] if options["programs"] else None
+    cliff_files = [task[2] for task in tasks] if args.cliffs else None
+    meta_path = build_metadata(
+        age_bands=age_bands, shard_files=shard_files, resolution=resolution,
+        curve_files=curve_files, program_files=program_files, cliff_files=cliff_files,
+        rewritten=[task[2] for task in tasks],
+    )
+    print(f"Metadata: {meta_path}")
 
     elapsed = time.time() - start
     print(f"\nTotal errors: {total_errors}")
@@ -246,10 +1728,9 @@ def main():
 
     # Report file sizes
     total_size = 0
-    for f in os.listdir(OUTPUT_DIR):
-        fpath = os.path.join(OUTPUT_DIR, f)
-        if os.path.isfile(fpath):
-            total_size += os.path.getsize(fpath)
+    for root, _, files in os.walk(OUTPUT_DIR):
+        for f in files:
+            total_size += os.path.getsize(os.path.join(root, f))
     print(f"Total data size: {total_size / 1024:.0f} KB ({total_size / 1024 / 1024:.1f} MB)")
 
 
@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+Score a household file (CSV or Parquet) against the TANF calculator.
+
+Rows inside the precomputed grid are answered by vectorized interpolation
+of the static state data; anything else (more children than the grid, income
+above $3,000/mo, enrolled households, missing or still-coarse state files)
+is simulated exactly in a process pool. Input is read and output written in bounded
+chunks, in input order, so memory stays flat regardless of file size.
+
+Input columns (annual incomes, as in calculator.calculate_tanf):
+    state, num_adults, num_children, earned_income
+    optional: unearned_income, county, is_tanf_enrolled,
+              child_ages (ages separated by ";" or spaces)
+
+Output: the input columns plus tanf_monthly, eligible and source
+("grid", "simulation" or "error").
+
+Parquet files need pyarrow (pip install pyarrow); CSV needs nothing extra.
+
+Usage:
+    python score.py households.csv scored.csv
+    python score.py households.parquet scored.parquet --workers 8
+"""
+
+import csv
+import os
+import sys
+import time
+from collections import deque
+from multiprocessing import cpu_count
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+import grids
+
+CHUNK_SIZE = 50000
+# Households per exact simulation (one multi-household Simulation each)
+SIMULATION_BATCH = 500
+# Arrow types of the columns score.py adds
+OUTPUT_TYPES = {"tanf_monthly": "int64", "eligible": "bool", "source": "string"}
+
+
+def _parse_bool(value) -> bool:
+    if isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "t", "yes", "y")
+    return bool(value)
+
+
+def row_state(row) -> str:
+    state = row.get("state")
+    if not isinstance(state, str) or not state.strip():
+        raise ValueError("missing state")
+    return state.strip().upper()
+
+
+def _parse_ages(value) -> list[int] | None:
+    if value is None or value == "":
+        return None
+    if isinstance(value, str):
+        return [int(age) for age in value.replace(";", " ").split()]
+    return [int(age) for age in value]
+
+
+def _household(row) -> dict:
+    """Normalize one input row into create_situation() keyword arguments."""
+    household = {
+        "num_adults": int(row["num_adults"]),
+        "num_children": int(row["num_children"]),
+        "earned_income": float(row.get("earned_income") or 0),
+        "unearned_income": float(row.get("unearned_income") or 0),
+        "county": row.get("county") or None,
+        "is_tanf_enrolled": _parse_bool(row.get("is_tanf_enrolled") or False),
+    }
+    child_ages = _parse_ages(row.get("child_ages"))
+    if child_ages is not None:
+        if len(child_ages) != household["num_children"]:
+            raise ValueError("child_ages does not match num_children")
+        household["child_ages"] = child_ages
+    return household
+
+
+def score_exact(args):
+    """Pool worker: exact simulation for a batch of one state's households."""
+    from calculator import _amounts_isolating_failures
+
+    state, year, households = args
+    return _amounts_isolating_failures(state, year, households)[0]
+
+
+def score_grid(states, households):
+    """
+    Answer on-grid rows from the precomputed data.
+
+    Returns {row index: monthly benefit} for the rows it could answer; the
+    rest need an exact simulation.
+    """
+    import numpy as np
+
+    metadata = grids.load_metadata()
+    earned_max = metadata["earned_steps"][-1]
+    unearned_max = metadata["unearned_steps"][-1]
+
+    # Group row indices by (state file, config) so each grid interpolates once
+    groups = {}
+    for index, (state, household) in enumerate(zip(states, households)):
+        if household is None:
+            continue
+        earned = household["earned_income"] / 12
+        unearned = household["unearned_income"] / 12
+        if not (0 <= earned <= earned_max and 0 <= unearned <= unearned_max):
+            continue
+        name = grids.output_name(state, household["county"])
+        key = grids.band_config_key(
+            name, household["num_adults"], household["num_children"],
+            household["is_tanf_enrolled"], household.get("child_ages"),
+        )
+        if key is None:
+            continue
+        groups.setdefault((name, key), []).append(index)
+
+    answers = {}
+    for (name, key), indices in groups.items():
+        grid = grids.grid_array(name, key)
+        # Cells of a still-coarse progressive file are mostly interpolated
+        if grid is None or grids.lattice_stride(name) > 1:
+            continue
+        earned = np.array([households[i]["earned_income"] / 12 for i in indices])
+        unearned = np.array([households[i]["unearned_income"] / 12 for i in indices])
+        for index, value in zip(indices, grids.interpolate(grid, earned, unearned)):
+            answers[index] = int(value)
+    return answers
+
+
+def _read_chunks(path, chunk_size):
+    """Yield lists of row dicts from a CSV or Parquet file."""
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pylist()
+        return
+    with open(path, newline="") as f:
+        chunk = []
+        for row in csv.DictReader(f):
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+
+class _Writer:
+    """
+    Streaming CSV or Parquet writer; columns come from the first chunk.
+
+    Parquet columns take their types from `input_schema` (the input file's
+    Arrow schema; strings for CSV input) and OUTPUT_TYPES, so a chunk whose
+    values happen to be all null still writes with the right types.
+    """
+
+    def __init__(self, path, input_schema=None):
+        self.path = path
+        self.input_schema = input_schema
+        self.file = None
+        self.writer = None
+
+    def write(self, rows):
+        if not rows:
+            return
+        if self.path.endswith(".parquet"):
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            if self.writer is None:
+                if self.input_schema is not None:
+                    fields = [field for field in self.input_schema if field.name not in OUTPUT_TYPES]
+                else:
+                    fields = [pa.field(name, pa.string()) for name in rows[0] if name not in OUTPUT_TYPES]
+                schema = pa.schema(
+                    fields + [pa.field(name, type_) for name, type_ in OUTPUT_TYPES.items()]
+                )
+                self.writer = pq.ParquetWriter(self.path, schema)
+            self.writer.write_table(pa.Table.from_pylist(rows, schema=self.writer.schema))
+            return
+        if self.writer is None:
+            self.file = open(self.path, "w", newline="")
+            self.writer = csv.DictWriter(self.file, fieldnames=list(rows[0]))
+            self.writer.writeheader()
+        self.writer.writerows(rows)
+
+    def close(self):
+        if self.path.endswith(".parquet"):
+            if self.writer is not None:
+                self.writer.close()
+        elif self.file is not None:
+            self.file.close()
+
+
+def _submit_chunk(pool, rows, year):
+    """Score the grid part of a chunk now and queue its exact simulations."""
+    # Invalid rows (no state, bad numbers) get source "error"
+    states = []
+    households = []
+    for row in rows:
+        try:
+            state, household = row_state(row), _household(row)
+        except (KeyError, TypeError, ValueError):
+            state = household = None
+        states.append(state)
+        households.append(household)
+    answers = score_grid(states, households)
+
+    by_state = {}
+    for index, household in enumerate(households):
+        if household is not None and index not in answers:
+            by_state.setdefault(states[index], []).append(index)
+    pending = []
+    for state, indices in by_state.items():
+        for start in range(0, len(indices), SIMULATION_BATCH):
+            batch = indices[start:start + SIMULATION_BATCH]
+            result = pool.apply_async(
+                score_exact, ((state, year, [households[i] for i in batch]),)
+            )
+            pending.append((batch, result))
+    return rows, answers, pending
+
+
+def _finish_chunk(rows, answers, pending):
+    """Wait for a chunk's simulations and attach results to its rows."""
+    sources = {index: "grid" for index in answers}
+    for batch, result in pending:
+        for index, amount in zip(batch, result.get()):
+            if amount is not None:
+                answers[index] = round(amount / 12)
+                sources[index] = "simulation"
+    for index, row in enumerate(rows):
+        monthly = answers.get(index)
+        row["tanf_monthly"] = monthly
+        row["eligible"] = None if monthly is None else monthly > 0
+        row["source"] = sources.get(index, "error")
+    return rows
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("input", help="Household file (.csv or .parquet)")
+    parser.add_argument("output", help="Scored output file (.csv or .parquet)")
+    parser.add_argument(
+        "--chunk-size", type=int, default=CHUNK_SIZE,
+        help=f"Rows per streamed chunk (default {CHUNK_SIZE:,})",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=cpu_count(),
+        help="Processes for off-grid exact simulations",
+    )
+    args = parser.parse_args()
+    if args.input.endswith(".parquet") or args.output.endswith(".parquet"):
+        try:
+            import pyarrow.parquet
+        except ImportError:
+            parser.error("Parquet input or output needs pyarrow: pip install pyarrow")
+
+    # Simulate at the same year the grids were computed for
+    year = grids.load_metadata()["year"]
+    input_schema = None
+    if args.input.endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        input_schema = pq.ParquetFile(args.input).schema_arrow
+    writer = _Writer(args.output, input_schema)
+    # Chunks whose simulations are still running; bounded to cap memory
+    in_flight = deque()
+    max_in_flight = 2
+    start = time.time()
+    done = 0
+    counts = {"grid": 0, "simulation": 0, "error": 0}
+
+    def drain_one():
+        nonlocal done
+        rows = _finish_chunk(*in_flight.popleft())
+        writer.write(rows)
+        done += len(rows)
+        for row in rows:
+            counts[row["source"]] += 1
+        elapsed = time.time() - start
+        print(
+            f"  {done:,} rows ({done / max(elapsed, 0.001):,.0f} rows/s): "
+            f"{counts['grid']:,} grid, {counts['simulation']:,} simulated, "
+            f"{counts['error']:,} errors",
+            file=sys.stderr,
+        )
+
+    from calculator import warm_process_context
+
+    try:
+        with warm_process_context().Pool(max(1, args.workers)) as pool:
+            for rows in _read_chunks(args.input, args.chunk_size):
+                in_flight.append(_submit_chunk(pool, rows, year))
+                if len(in_flight) >= max_in_flight:
+                    drain_one()
+            while in_flight:
+                drain_one()
+    finally:
+        writer.close()
+
+    elapsed = time.time() - start
+    print(f"Scored {done:,} rows in {elapsed:.0f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,329 @@
+"""
+Run telemetry for precompute.py.
+
+Pool workers record per-simulation latency (single households and batched
+simulations in separate histograms), cells done, errors by exception type
+and their RSS, and send deltas to the parent every few seconds over a
+multiprocessing queue. The parent aggregates them, streams every event as a
+JSON line and keeps a Prometheus textfile (node_exporter textfile collector
+format) up to date, with an ETA based on measured throughput.
+"""
+
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+# Upper bounds (seconds) of the simulation latency histogram buckets
+LATENCY_BUCKETS = [0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0]
+# The same for batched multi-household simulations, timed per batch
+BATCH_LATENCY_BUCKETS = [0.5, 1.0, 2.5, 5.0, 10.0, 25.0, 50.0, 100.0, 250.0]
+# Seconds between progress events from a worker
+FLUSH_INTERVAL = 2.0
+# Seconds between Prometheus textfile rewrites
+PROM_INTERVAL = 5.0
+
+# ---------------------------------------------------------------------------
+# Worker side
+# ---------------------------------------------------------------------------
+
+_queue = None
+_task = None
+
+
+def init_worker(queue):
+    """Pool initializer: route this worker's events to `queue` (None = off)."""
+    global _queue
+    _queue = queue
+
+
+def _new_counts():
+    return {
+        "cells": 0,
+        "simulations": 0,
+        "latency_buckets": [0] * (len(LATENCY_BUCKETS) + 1),
+        "latency_sum": 0.0,
+        "batches": 0,
+        "batch_households": 0,
+        "batch_latency_buckets": [0] * (len(BATCH_LATENCY_BUCKETS) + 1),
+        "batch_latency_sum": 0.0,
+        "errors": {},
+    }
+
+
+def _bucket(seconds, bounds):
+    return next((i for i, bound in enumerate(bounds) if seconds <= bound), len(bounds))
+
+
+def _rss_bytes() -> tuple[int, int]:
+    """(current, peak) resident set size of this process; 0 where unknown."""
+    try:
+        import resource
+    except ImportError:
+        # Windows has no resource module (nor /proc)
+        return 0, 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak *= 1 if sys.platform == "darwin" else 1024  # KB on Linux
+    try:
+        with open("/proc/self/statm") as f:
+            current = int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        current = peak
+    return current, peak
+
+
+def _send(event: str, **fields):
+    current, peak = _rss_bytes()
+    _queue.put({
+        "event": event,
+        "time": time.time(),
+        "pid": os.getpid(),
+        "rss_bytes": current,
+        "peak_rss_bytes": peak,
+        **fields,
+    })
+
+
+def start_task(name: str):
+    global _task
+    if _queue is None:
+        return
+    _task = {"name": name, "counts": _new_counts(), "flushed": time.monotonic()}
+    _send("task_start", task=name)
+
+
+def _flush(event="progress"):
+    _send(event, task=_task["name"], **_task["counts"])
+    _task["counts"] = _new_counts()
+    _task["flushed"] = time.monotonic()
+
+
+def _record_error(error: str | None):
+    if error:
+        errors = _task["counts"]["errors"]
+        errors[error] = errors.get(error, 0) + 1
+    if time.monotonic() - _task["flushed"] >= FLUSH_INTERVAL:
+        _flush()
+
+
+def record_simulation(seconds: float, error: str | None = None):
+    """Record one single-household simulation's latency and, if it failed, its error type."""
+    if _task is None:
+        return
+    counts = _task["counts"]
+    counts["simulations"] += 1
+    counts["latency_sum"] += seconds
+    counts["latency_buckets"][_bucket(seconds, LATENCY_BUCKETS)] += 1
+    _record_error(error)
+
+
+def record_batch(seconds: float, households: int, error: str | None = None):
+    """
+    Record one batched simulation of `households` households. Kept in its
+    own histogram, since a batch takes far longer than a single household.
+    """
+    if _task is None:
+        return
+    counts = _task["counts"]
+    counts["batches"] += 1
+    counts["batch_households"] += households
+    counts["batch_latency_sum"] += seconds
+    counts["batch_latency_buckets"][_bucket(seconds, BATCH_LATENCY_BUCKETS)] += 1
+    _record_error(error)
+
+
+def record_cells(n: int):
+    """Record grid cells finished, whether simulated or skipped."""
+    if _task is not None:
+        _task["counts"]["cells"] += n
+
+
+def finish_task():
+    global _task
+    if _task is None:
+        return
+    _flush("task_done")
+    _task = None
+
+
+# ---------------------------------------------------------------------------
+# Parent side
+# ---------------------------------------------------------------------------
+
+class Collector:
+    """Aggregates worker events into JSON lines and a Prometheus textfile."""
+
+    def __init__(self, queue, total_cells, jsonl_path=None, prom_path=None):
+        self.queue = queue
+        self.total_cells = total_cells
+        self.jsonl = open(jsonl_path, "a") if jsonl_path else None
+        self.prom_path = prom_path
+        self.start_time = time.time()
+        self.cells = {}
+        self.task_started = {}
+        self.task_rates = {}
+        self.tasks_done = 0
+        self.simulations = 0
+        self.latency_buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.latency_sum = 0.0
+        self.batches = 0
+        self.batch_households = 0
+        self.batch_latency_buckets = [0] * (len(BATCH_LATENCY_BUCKETS) + 1)
+        self.batch_latency_sum = 0.0
+        self.errors = {}
+        self.rss = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self._drain()
+        self.write_prometheus()
+        if self.jsonl:
+            self.jsonl.close()
+
+    def _drain(self):
+        import queue as queue_module
+
+        while True:
+            try:
+                self.handle(self.queue.get_nowait())
+            except queue_module.Empty:
+                return
+
+    def _run(self):
+        import queue as queue_module
+
+        last_prom = 0.0
+        while not self._stop.is_set():
+            try:
+                self.handle(self.queue.get(timeout=0.5))
+            except queue_module.Empty:
+                pass
+            if time.monotonic() - last_prom >= PROM_INTERVAL:
+                self.write_prometheus()
+                last_prom = time.monotonic()
+
+    def handle(self, event):
+        task = event["task"]
+        self.rss[event["pid"]] = (event["rss_bytes"], event["peak_rss_bytes"])
+        if event["event"] == "task_start":
+            self.task_started[task] = event["time"]
+        else:
+            self.cells[task] = self.cells.get(task, 0) + event["cells"]
+            self.simulations += event["simulations"]
+            self.latency_sum += event["latency_sum"]
+            for i, n in enumerate(event["latency_buckets"]):
+                self.latency_buckets[i] += n
+            self.batches += event["batches"]
+            self.batch_households += event["batch_households"]
+            self.batch_latency_sum += event["batch_latency_sum"]
+            for i, n in enumerate(event["batch_latency_buckets"]):
+                self.batch_latency_buckets[i] += n
+            for error, n in event["errors"].items():
+                self.errors[error] = self.errors.get(error, 0) + n
+            elapsed = event["time"] - self.task_started.get(task, self.start_time)
+            self.task_rates[task] = self.cells[task] / max(elapsed, 0.001)
+            if event["event"] == "task_done":
+                self.tasks_done += 1
+        if self.jsonl:
+            self.jsonl.write(json.dumps({**event, "eta_seconds": self.eta_seconds()}) + "\n")
+            self.jsonl.flush()
+
+    def cells_done(self) -> int:
+        return sum(self.cells.values())
+
+    def eta_seconds(self) -> float | None:
+        """Remaining cells over the throughput measured so far."""
+        done = self.cells_done()
+        if not done:
+            return None
+        rate = done / max(time.time() - self.start_time, 0.001)
+        return max(self.total_cells - done, 0) / rate
+
+    def task_rate(self, task) -> float:
+        """Measured cells/s of one task (state file)."""
+        return self.task_rates.get(task, 0.0)
+
+    def write_prometheus(self):
+        if not self.prom_path:
+            return
+        lines = [
+            "# HELP tanf_precompute_cells_total Grid cells finished (simulated or skipped).",
+            "# TYPE tanf_precompute_cells_total counter",
+        ]
+        for task, cells in sorted(self.cells.items()):
+            lines.append(f'tanf_precompute_cells_total{{task="{task}"}} {cells}')
+        lines += [
+            "# HELP tanf_precompute_task_cells_per_second Measured throughput per state file.",
+            "# TYPE tanf_precompute_task_cells_per_second gauge",
+        ]
+        for task, rate in sorted(self.task_rates.items()):
+            lines.append(f'tanf_precompute_task_cells_per_second{{task="{task}"}} {rate:.3f}')
+        lines += _histogram(
+            "tanf_precompute_simulation_seconds", "Latency of single-household simulations.",
+            LATENCY_BUCKETS, self.latency_buckets, self.latency_sum, self.simulations,
+        )
+        lines += _histogram(
+            "tanf_precompute_simulation_batch_seconds",
+            "Latency of batched multi-household simulations, per batch.",
+            BATCH_LATENCY_BUCKETS, self.batch_latency_buckets, self.batch_latency_sum, self.batches,
+        )
+        lines += [
+            "# HELP tanf_precompute_simulation_batch_households_total Households simulated in batches.",
+            "# TYPE tanf_precompute_simulation_batch_households_total counter",
+            f"tanf_precompute_simulation_batch_households_total {self.batch_households}",
+        ]
+        lines += [
+            "# HELP tanf_precompute_errors_total Failed simulations by exception type.",
+            "# TYPE tanf_precompute_errors_total counter",
+        ]
+        for error, n in sorted(self.errors.items()):
+            lines.append(f'tanf_precompute_errors_total{{type="{error}"}} {n}')
+        lines += [
+            "# HELP tanf_precompute_worker_rss_bytes Resident set size per worker.",
+            "# TYPE tanf_precompute_worker_rss_bytes gauge",
+        ]
+        for pid, (current, _) in sorted(self.rss.items()):
+            lines.append(f'tanf_precompute_worker_rss_bytes{{pid="{pid}"}} {current}')
+        lines += [
+            "# HELP tanf_precompute_worker_peak_rss_bytes Peak resident set size per worker.",
+            "# TYPE tanf_precompute_worker_peak_rss_bytes gauge",
+        ]
+        for pid, (_, peak) in sorted(self.rss.items()):
+            lines.append(f'tanf_precompute_worker_peak_rss_bytes{{pid="{pid}"}} {peak}')
+        eta = self.eta_seconds()
+        lines += [
+            "# HELP tanf_precompute_tasks_completed State files finished.",
+            "# TYPE tanf_precompute_tasks_completed gauge",
+            f"tanf_precompute_tasks_completed {self.tasks_done}",
+            "# HELP tanf_precompute_eta_seconds Estimated seconds until all cells are done.",
+            "# TYPE tanf_precompute_eta_seconds gauge",
+            f"tanf_precompute_eta_seconds {eta if eta is not None else 'NaN'}",
+        ]
+
+        # Write-then-rename so the collector never reads a partial file
+        directory = os.path.dirname(os.path.abspath(self.prom_path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(tmp_path, self.prom_path)
+
+
+def _histogram(name, help_text, bounds, buckets, total, count):
+    """Prometheus text lines of one histogram family."""
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+    cumulative = 0
+    for bound, n in zip(bounds + ["+Inf"], buckets):
+        cumulative += n
+        lines.append(f'{name}_bucket{{le="{bound}"}} {cumulative}')
+    lines.append(f"{name}_sum {total:.6f}")
+    lines.append(f"{name}_count {count}")
+    return lines
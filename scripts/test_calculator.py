@@ -0,0 +1,69 @@
+"""Tests for calculator.py that run without PolicyEngine (simulations are mocked)."""
+
+import math
+
+import pytest
+
+import calculator
+
+
+def _schedule(benefit):
+    """A fake _calculate_tanf_amounts paying benefit(earned, unearned) per household."""
+    calls = []
+
+    def calculate(state, year, households, **kwargs):
+        calls.append(len(households))
+        return [
+            benefit(household.get("earned_income", 0), household.get("unearned_income", 0))
+            for household in households
+        ]
+
+    return calculate, calls
+
+
+def _search(income_type="earned"):
+    return {"household": {"num_adults": 1, "num_children": 2}, "income_type": income_type}
+
+
+@pytest.mark.parametrize("income_type", ["earned", "unearned"])
+def test_breakeven_linear_phase_out(monkeypatch, income_type):
+    calculate, _ = _schedule(
+        lambda earned, unearned: max(0.0, 6000 - (earned + unearned) / 4)
+    )
+    monkeypatch.setattr(calculator, "_calculate_tanf_amounts", calculate)
+    [income] = calculator.find_breakeven_incomes("CA", 2025, [_search(income_type)])
+    assert 24000 <= income <= 24012
+
+
+def test_breakeven_cliff(monkeypatch):
+    calculate, calls = _schedule(lambda earned, unearned: 5000.0 if earned < 30000 else 0.0)
+    monkeypatch.setattr(calculator, "_calculate_tanf_amounts", calculate)
+    [income] = calculator.find_breakeven_incomes("CA", 2025, [_search()])
+    assert 30000 <= income <= 30012
+    # The bracketing call plus at most one bisection step per halving
+    assert len(calls) <= 1 + math.ceil(math.log2(120000 / 12))
+
+
+def test_breakeven_without_a_crossing(monkeypatch):
+    calculate, calls = _schedule(lambda earned, unearned: 0.0)
+    monkeypatch.setattr(calculator, "_calculate_tanf_amounts", calculate)
+    assert calculator.find_breakeven_incomes("CA", 2025, [_search()]) == [None]
+    assert calls == [2]
+
+    calculate, _ = _schedule(lambda earned, unearned: 100.0)
+    monkeypatch.setattr(calculator, "_calculate_tanf_amounts", calculate)
+    assert calculator.find_breakeven_incomes("CA", 2025, [_search()]) == [None]
+
+
+def test_breakeven_searches_run_in_lockstep(monkeypatch):
+    calculate, calls = _schedule(
+        lambda earned, unearned: max(0.0, 6000 - earned / 4) if unearned == 0 else 0.0
+    )
+    monkeypatch.setattr(calculator, "_calculate_tanf_amounts", calculate)
+    searches = [_search("earned"), _search("unearned")]
+    earned, unearned = calculator.find_breakeven_incomes("CA", 2025, searches)
+    assert 24000 <= earned <= 24012
+    # Any unearned income at all ends the benefit
+    assert 0 < unearned <= 12
+    # Both ends of both searches go in the first simulation
+    assert calls[0] == 4
@@ -0,0 +1,105 @@
+"""Tests for precompute.py that run without PolicyEngine (simulations are mocked)."""
+
+import precompute
+
+
+def test_age_bands_merge_ages_with_the_same_results(monkeypatch):
+    def calculate(state, year, households, **kwargs):
+        amounts = []
+        for household in households:
+            age = household["child_ages"][0]
+            per_child = 600 if age < 6 else 500 if age < 18 else 0
+            amounts.append(12 * per_child * household["num_children"])
+        return amounts
+
+    monkeypatch.setattr(precompute, "_calculate_tanf_amounts", calculate)
+    assert precompute.probe_age_bands("CA", None) == [
+        {"min_age": 0, "max_age": 5, "age": 5},
+        {"min_age": 6, "max_age": 17, "age": 6},
+        {"min_age": 18, "max_age": None, "age": 18},
+    ]
+
+
+def test_age_bands_without_age_rules(monkeypatch):
+    monkeypatch.setattr(
+        precompute, "_calculate_tanf_amounts",
+        lambda state, year, households, **kwargs: [1200.0] * len(households),
+    )
+    assert precompute.probe_age_bands("CA", None) == [{"min_age": 0, "max_age": None, "age": 5}]
+
+
+def _fake_program_amounts(benefit, calls):
+    def calculate(earned_income, unearned_income, programs, **kwargs):
+        calls.append((earned_income, unearned_income))
+        amount = 12 * benefit(earned_income / 12, unearned_income / 12)
+        return {program: amount for program in programs}
+
+    return calculate
+
+
+def test_monotone_grid_skips_only_zero_cells(monkeypatch):
+    def benefit(earned, unearned):
+        return max(0, 1500 - earned - 2 * unearned)
+
+    calls = []
+    monkeypatch.setattr(precompute, "_calculate_program_amounts", _fake_program_amounts(benefit, calls))
+    full, _, full_count, _, full_skipped = precompute.compute_grid("CA", None, 1, 2, False)
+    calls.clear()
+    grid, _, count, errors, skipped = precompute.compute_grid("CA", None, 1, 2, False, monotone=True)
+
+    assert full_skipped == []
+    assert grid == full
+    assert errors == 0
+    assert skipped
+    assert all(full[i][j] == 0 for i, j in skipped)
+    assert count == len(calls) == full_count - len(skipped)
+
+
+def test_monotone_grid_keeps_computing_while_benefits_are_positive(monkeypatch):
+    calls = []
+    monkeypatch.setattr(
+        precompute, "_calculate_program_amounts",
+        _fake_program_amounts(lambda earned, unearned: 100, calls),
+    )
+    grid, _, count, _, skipped = precompute.compute_grid("CA", None, 1, 2, False, monotone=True)
+    assert skipped == []
+    assert count == len(precompute.EARNED_STEPS) * len(precompute.UNEARNED_STEPS)
+    assert all(cell == 100 for row in grid for cell in row)
+
+
+def test_dedup_years_refers_to_the_first_year_with_the_grid():
+    grids_by_year = {
+        2025: {"a": [[1, 0]], "b": [[1, 0]], "c": [[3, 0]]},
+        2024: {"a": [[1, 0]], "b": [[2, 0]], "c": [[4, 0]]},
+        2026: {"a": [[1, 0]], "b": [[2, 0]], "c": [[3, 0]]},
+    }
+    output, replaced = precompute._dedup_years(grids_by_year, [2025, 2024, 2026])
+    assert output[2025] == grids_by_year[2025]
+    assert output[2024] == {"a": 2025, "b": [[2, 0]], "c": [[4, 0]]}
+    assert output[2026] == {"a": 2025, "b": 2024, "c": 2025}
+    assert replaced == 4
+
+
+def test_fill_grid_is_exact_on_a_linear_lattice():
+    size = 7
+    rows = precompute._lattice(size, 3)
+    assert rows == [0, 3, 6]
+    full = [[10 * i + 4 * j for j in range(size)] for i in range(size)]
+    cells = [
+        [full[i][j] if i in rows and j in rows else None for j in range(size)]
+        for i in range(size)
+    ]
+    assert precompute._fill_grid(cells) == full
+
+
+def test_fill_grid_rounds_and_keeps_computed_cells():
+    cells = [
+        [0, None, 3],
+        [None, None, None],
+        [4, None, 0],
+    ]
+    assert precompute._fill_grid(cells) == [
+        [0, 2, 3],
+        [2, 2, 2],
+        [4, 2, 0],
+    ]
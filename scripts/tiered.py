@@ -0,0 +1,213 @@
+"""
+Tiered TANF answers: an instant estimate from the precomputed grids, then
+the exact calculate_tanf result from a warm worker pool.
+
+    with TieredCalculator(workers=2) as calculator:
+        estimate, exact = calculator.calculate(
+            state="NY", year=2025, num_adults=1, num_children=2,
+            earned_income=14400, callback=show_exact,
+        )
+        show(estimate)          # None if the household is off the grid
+        exact.result()          # or wait for show_exact(result)
+"""
+import json
+import os
+import sys
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+import grids
+from config import PILOT_STATES, DEFAULT_YEAR
+
+# Household simulated once per worker at startup so policyengine-us (and
+# its parameter tree) is loaded before the first real request arrives
+WARM_HOUSEHOLD = {
+    "state": "NY",
+    "year": DEFAULT_YEAR,
+    "num_adults": 1,
+    "num_children": 1,
+    "earned_income": 0,
+    "fields": [],
+}
+
+
+def estimate_tanf(
+    state: str,
+    year: int,
+    num_adults: int,
+    num_children: int,
+    earned_income: float,
+    unearned_income: float = 0,
+    child_ages: list[int] | None = None,
+    county: str | None = None,
+    is_tanf_enrolled: bool = False,
+    resources: float = 0,
+) -> dict | None:
+    """
+    TANF benefit interpolated from the precomputed grids, with an error bound.
+
+    "error_bound_monthly" is the distance from the estimate to the furthest
+    grid value around the household (axis-curve value, when one income is
+    $0 and the state file has curves), plus $1 for rounding. Grids from a
+    progressive run that hasn't reached full resolution use the corners of
+    the coarser simulated cell. The bound holds as long as the benefit
+    doesn't peak or dip strictly inside that cell; a cliff inside the cell
+    is covered, since a $0 corner bounds it.
+
+    Returns None when the grids can't answer: another year than they were
+    computed for, incomes above the grid, non-zero resources (grids assume
+    none), or a config, age band or state file that isn't precomputed.
+    """
+    try:
+        metadata = grids.load_metadata()
+    except OSError:
+        return None
+    earned_monthly = earned_income / 12
+    unearned_monthly = unearned_income / 12
+    if (
+        year != metadata["year"]
+        or resources
+        or not 0 <= earned_monthly <= metadata["earned_steps"][-1]
+        or not 0 <= unearned_monthly <= metadata["unearned_steps"][-1]
+    ):
+        return None
+    name = grids.output_name(state, county)
+    key = grids.band_config_key(name, num_adults, num_children, is_tanf_enrolled, child_ages)
+    grid = grids.grid_array(name, key) if key else None
+    if grid is None:
+        return None
+
+    # Exact curves are much finer than the grid where the household is on an axis
+    on_axis = grids.axis_lookup(name, key, earned_monthly, unearned_monthly)
+    if on_axis is not None:
+        monthly, low, high = on_axis
+        monthly = int(monthly)
+    else:
+        monthly = int(grids.interpolate(grid, earned_monthly, unearned_monthly))
+        low, high = grids.cell_range(
+            grid, earned_monthly, unearned_monthly, stride=grids.lattice_stride(name)
+        )
+    bound = int(max(high - monthly, monthly - low)) + 1
+    return {
+        "tanf_monthly": monthly,
+        "tanf_annual": monthly * 12,
+        "eligible": monthly > 0,
+        "state": state,
+        "state_name": PILOT_STATES.get(state, state),
+        "year": year,
+        "estimate": True,
+        "error_bound_monthly": bound,
+    }
+
+
+def _warm_worker():
+    """Pool initializer: load policyengine-us before taking requests."""
+    from calculator import calculate_tanf
+
+    try:
+        calculate_tanf(**WARM_HOUSEHOLD)
+    except Exception:
+        pass
+
+
+def _exact(household: dict) -> dict:
+    from calculator import calculate_tanf
+
+    return calculate_tanf(**household)
+
+
+class TieredCalculator:
+    """
+    calculate_tanf with an instant grid estimate and exact refinement.
+
+    Exact simulations run on a process pool whose workers load
+    policyengine-us when the calculator is created. Identical requests
+    in flight share one simulation and one future.
+    """
+
+    def __init__(self, workers: int = 2):
+        from calculator import warm_process_context
+
+        self.executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=warm_process_context(),
+            initializer=_warm_worker,
+        )
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        # Workers start on demand; start them all now so each warms up
+        for _ in range(workers):
+            self.executor.submit(int)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+    def calculate(
+        self,
+        state: str,
+        year: int,
+        num_adults: int,
+        num_children: int,
+        earned_income: float,
+        unearned_income: float = 0,
+        child_ages: list[int] | None = None,
+        county: str | None = None,
+        is_tanf_enrolled: bool = False,
+        resources: float = 0,
+        fields: list[str] | None = None,
+        reform: dict | None = None,
+        callback=None,
+    ) -> tuple[dict | None, Future]:
+        """
+        Estimate now, exact result later.
+
+        Takes calculate_tanf's arguments. Returns (estimate, future): the
+        estimate_tanf() result (None off the grid or under a reform) and a
+        future resolving to calculate_tanf's result. `callback`, if given,
+        is called with that result once it's ready; failures are only
+        reported through the future.
+        """
+        household = {
+            "state": state,
+            "year": year,
+            "num_adults": num_adults,
+            "num_children": num_children,
+            "earned_income": earned_income,
+            "unearned_income": unearned_income,
+            "child_ages": child_ages,
+            "county": county,
+            "is_tanf_enrolled": is_tanf_enrolled,
+            "resources": resources,
+        }
+        estimate = None if reform else estimate_tanf(**household)
+
+        request = {**household, "fields": fields, "reform": reform}
+        key = json.dumps(request, sort_keys=True)
+        with self._lock:
+            future = self._in_flight.get(key)
+            submitted = future is None
+            if submitted:
+                future = self.executor.submit(_exact, request)
+                self._in_flight[key] = future
+        # Outside the lock: callbacks of an already finished future run here
+        if submitted:
+            future.add_done_callback(lambda done: self._forget(key, done))
+        if callback is not None:
+            def deliver(done):
+                if not done.cancelled() and done.exception() is None:
+                    callback(done.result())
+            future.add_done_callback(deliver)
+        return estimate, future
+
+    def _forget(self, key, future):
+        with self._lock:
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]